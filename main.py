@@ -1,4 +1,173 @@
-from typing import Optional, List, Dict, Any, Tuple
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from operator import itemgetter
+from typing import Optional, List, Dict, Any, Mapping, Tuple
+
+import numpy as np
+
+# Numba compiles the numeric kernels below to native code when available;
+# without it the decorated functions run as plain Python with identical results
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        def decorator(func):
+            return func
+        return decorator
+
+# Precomputed CKD-EPI age decay (0.9938 ** age) for the 0-120 range, so the
+# hot path does a tuple index instead of a fractional pow per call; the log
+# constant serves the exp-based fallback and the vectorized batch path,
+# where exp(age * ln 0.9938) replaces a full pow dispatch
+_LN_0_9938 = math.log(0.9938)
+_AGE_DECAY = tuple(math.exp(a * _LN_0_9938) for a in range(121))
+
+# Du Bois coefficient in log space, so BSA needs one exp instead of two
+# fractional pow calls
+_LOG_BSA_COEF = math.log(0.007184)
+
+# BMI factor buckets (severely underweight through very severely obese);
+# bisect over the edges replaces the eight-way comparison ladder
+_BMI_EDGES = (16.0, 18.5, 25.0, 27.5, 30.0, 35.0, 40.0)
+_BMI_FACTORS = (0.93, 0.96, 1.0, 0.98, 0.96, 0.93, 0.90, 0.87)
+
+# Hypertension stage thresholds (elevated / stage 1 / stage 2 / crisis);
+# each pressure is binned independently and the worse of the two wins,
+# which matches the or-conditions of the original comparison ladder
+_BP_SYSTOLIC_EDGES = (130, 140, 160, 180)
+_BP_DIASTOLIC_EDGES = (85, 90, 100, 120)
+_BP_FACTORS = (0.94, 0.88, 0.82, 0.75)
+_BP_CATEGORIES = ("elevated", "stage1", "stage2", "crisis")
+
+# Hydration factors for integer levels 0-10, precomputed from the piecewise
+# dehydration curve (severe <= 3, mild <= 6, well hydrated above) so the hot
+# path is a clamp and a tuple index
+_HYDRATION_FACTORS = tuple(
+    0.75 + level * 0.05 if level <= 3
+    else 0.90 + (level - 3) * 0.025 if level <= 6
+    else 0.975 + (level - 6) * 0.00625
+    for level in range(11)
+)
+
+# Symptom interaction bonus for each high-symptom combination, indexed by a
+# (stress, fatigue, pain) bitmask so the hot path does three comparisons and
+# one tuple lookup instead of four compound conditions
+_SYMPTOM_INTERACTION = tuple(
+    0.03 * ((m & 3) == 3)   # stress and fatigue both high
+    + 0.02 * ((m & 5) == 5)  # pain and stress both high
+    + 0.02 * ((m & 6) == 6)  # pain and fatigue both high
+    + 0.03 * (m == 7)        # additional impact when all three are high
+    for m in range(8)
+)
+
+
+def _round1(x: float) -> float:
+    """
+    Round a non-negative value to one decimal, half up.
+
+    Cheaper than the round() builtin on the hot path and avoids its
+    tie-to-even behavior at .X5 boundaries.
+    """
+    return int(x * 10.0 + 0.5) / 10.0
+
+
+def _classify_blood_pressure(systolic_bp: int, diastolic_bp: int) -> Tuple[float, str]:
+    """Map a blood pressure reading to its (factor, category) pair."""
+    severity = max(bisect_right(_BP_SYSTOLIC_EDGES, systolic_bp),
+                   bisect_right(_BP_DIASTOLIC_EDGES, diastolic_bp))
+    if severity:
+        return _BP_FACTORS[severity - 1], _BP_CATEGORIES[severity - 1]
+    if systolic_bp >= 110 and diastolic_bp >= 70:
+        return 1.0, "normal"
+    if systolic_bp < 100 or diastolic_bp < 60:
+        # Low blood pressure can also affect kidney perfusion
+        return 0.96, "low"
+    return 1.0, "normal"
+
+@njit
+def _ckdepi_2021(age_decay: float, is_female: bool, creatinine: float) -> float:
+    """Numeric core of the CKD-EPI 2021 equation (no race factor)."""
+    if is_female:
+        if creatinine <= 0.7:
+            gfr = 142 * ((creatinine / 0.7) ** -0.241) * age_decay
+        else:
+            gfr = 142 * ((creatinine / 0.7) ** -1.200) * age_decay
+    else:
+        if creatinine <= 0.9:
+            gfr = 142 * ((creatinine / 0.9) ** -0.302) * age_decay
+        else:
+            gfr = 142 * ((creatinine / 0.9) ** -1.200) * age_decay
+    # Cap maximum GFR value at 120
+    return min(gfr, 120.0)
+
+@njit
+def _count_patterns(readings):
+    """Count adjacent rises, falls and direction reversals in one pass."""
+    ups = 0
+    downs = 0
+    alternating = 0
+    for i in range(readings.size - 1):
+        if readings[i] > readings[i + 1]:
+            ups += 1
+        elif readings[i] < readings[i + 1]:
+            downs += 1
+    for i in range(readings.size - 2):
+        if (readings[i] > readings[i + 1] and readings[i + 1] < readings[i + 2]) or \
+           (readings[i] < readings[i + 1] and readings[i + 1] > readings[i + 2]):
+            alternating += 1
+    return ups, downs, alternating
+
+@dataclass(slots=True)
+class GfrResult:
+    """
+    Result of a single GFR estimation.
+
+    Slotted fields avoid the per-result hash table a plain dict carries while
+    keeping the dict-style access the callers already use: result["method"],
+    result.get("trend"), and merging trend analysis via result.update().
+    Trend fields stay None until a reading history is supplied, and get()
+    treats a None field like a missing key.
+    """
+    gfr_estimate: float
+    method: str
+    confidence: str
+    calculation: str
+    confidence_score: Optional[int] = None
+    trend: Optional[str] = None
+    trend_description: Optional[str] = None
+    absolute_change: Optional[float] = None
+    percent_change: Optional[float] = None
+    long_term_trend: Optional[str] = None
+    stability: Optional[str] = None
+    variability: Optional[float] = None
+    rate_of_change: Optional[float] = None
+    pattern: Optional[str] = None
+    pattern_confidence: Optional[int] = None
+    clinical_significance: Optional[str] = None
+    data_points: Optional[int] = None
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+    def update(self, fields: Dict[str, Any]) -> None:
+        for key, value in fields.items():
+            setattr(self, key, value)
+
 
 def estimate_gfr_score(
     age: int,
@@ -14,7 +183,7 @@ def estimate_gfr_score(
     creatinine: Optional[float] = None,  # in mg/dL
     race: Optional[str] = None,          # Optional race parameter
     previous_gfr_readings: Optional[List[Dict[str, Any]]] = None  # List of previous GFR readings with dates
-) -> dict:
+) -> GfrResult:
     """
     Advanced GFR estimation engine with dual calculation methods and trend detection.
     
@@ -26,90 +195,46 @@ def estimate_gfr_score(
     
     Returns a comprehensive result with GFR estimate, calculation method, and trend analysis.
     """
-    # Base factors
-    gender_factor = 0.85 if gender.lower() == 'female' else 1.0
-    bsa = 0.007184 * (height_cm**0.725) * (weight_kg**0.425)  # Du Bois formula
-    bmi = weight_kg / ((height_cm / 100) ** 2)  # BMI calculation
-    
+    # Base factors; normalize gender once instead of lowercasing per branch
+    is_female = gender.lower() == 'female'
+    gender_factor = 0.85 if is_female else 1.0
+
     # Method 1: CKD-EPI 2021 equation (no race factor)
     # Reference: https://www.kidney.org/content/ckd-epi-creatinine-equation-2021
     if creatinine is not None and creatinine > 0:
-        # Check gender for appropriate coefficients
-        if gender.lower() == 'female':
-            if creatinine <= 0.7:
-                gfr = 142 * ((creatinine / 0.7) ** -0.241) * (0.9938 ** age)
-            else:
-                gfr = 142 * ((creatinine / 0.7) ** -1.200) * (0.9938 ** age)
-        else:  # male
-            if creatinine <= 0.9:
-                gfr = 142 * ((creatinine / 0.9) ** -0.302) * (0.9938 ** age)
-            else:
-                gfr = 142 * ((creatinine / 0.9) ** -1.200) * (0.9938 ** age)
-                
-        # Cap maximum GFR value at 120
-        gfr = min(gfr, 120)
+        # Table lookup for integer ages in range; fall back to pow otherwise
+        if isinstance(age, int) and 0 <= age < len(_AGE_DECAY):
+            age_decay = _AGE_DECAY[age]
+        else:
+            age_decay = math.exp(age * _LN_0_9938)
+
+        gfr = _ckdepi_2021(age_decay, is_female, float(creatinine))
         
-        result = {
-            "gfr_estimate": round(gfr, 1),
-            "method": "creatinine-based",
-            "confidence": "high",
-            "calculation": "CKD-EPI 2021"
-        }
+        result = GfrResult(
+            gfr_estimate=_round1(gfr),
+            method="creatinine-based",
+            confidence="high",
+            calculation="CKD-EPI 2021"
+        )
     
     # Method 2: Enhanced ML model approximation (when creatinine is unavailable)
     else:
-        # BMI impact - refine the BMI factor with more granular categories
-        if bmi < 16.0:  # severely underweight
-            bmi_factor = 0.93
-        elif 16.0 <= bmi < 18.5:  # underweight
-            bmi_factor = 0.96
-        elif 18.5 <= bmi < 25.0:  # normal
-            bmi_factor = 1.0
-        elif 25.0 <= bmi < 27.5:  # slightly overweight
-            bmi_factor = 0.98
-        elif 27.5 <= bmi < 30.0:  # overweight
-            bmi_factor = 0.96
-        elif 30.0 <= bmi < 35.0:  # moderately obese
-            bmi_factor = 0.93
-        elif 35.0 <= bmi < 40.0:  # severely obese
-            bmi_factor = 0.90
-        else:  # very severely obese
-            bmi_factor = 0.87
+        # Body metrics are only needed by this branch, so the creatinine
+        # path above skips the fractional pow calls entirely
+        bsa = math.exp(0.725 * math.log(height_cm) + 0.425 * math.log(weight_kg) + _LOG_BSA_COEF)  # Du Bois formula
+        bmi = weight_kg / ((height_cm / 100) ** 2)  # BMI calculation
+
+        # BMI impact - granular category factors via binary search over the
+        # precomputed edges instead of an eight-way comparison ladder
+        bmi_factor = _BMI_FACTORS[bisect_right(_BMI_EDGES, bmi)]
             
         # Enhanced hydration impact with non-linear scaling
         # Studies show severe dehydration has a more pronounced effect
-        if hydration_level <= 3:  # severely dehydrated
-            hydration_factor = 0.75 + (hydration_level * 0.05)  # 0.80 to 0.90
-        elif hydration_level <= 6:  # mildly dehydrated
-            hydration_factor = 0.90 + ((hydration_level - 3) * 0.025)  # 0.925 to 0.975
-        else:  # well hydrated
-            hydration_factor = 0.975 + ((hydration_level - 6) * 0.00625)  # 0.98125 to 1.0
+        hydration_factor = _HYDRATION_FACTORS[max(0, min(10, hydration_level))]
         
         # More precise blood pressure impact based on both systolic and diastolic
         # Reference: Kidney Int. 2017 study - impact of hypertension on kidney function
-        bp_category = "normal"
-        if systolic_bp >= 180 or diastolic_bp >= 120:  # crisis
-            bp_factor = 0.75
-            bp_category = "crisis"
-        elif systolic_bp >= 160 or diastolic_bp >= 100:  # stage 2
-            bp_factor = 0.82
-            bp_category = "stage2"
-        elif systolic_bp >= 140 or diastolic_bp >= 90:  # stage 1
-            bp_factor = 0.88
-            bp_category = "stage1"
-        elif systolic_bp >= 130 or diastolic_bp >= 85:  # elevated
-            bp_factor = 0.94
-            bp_category = "elevated"
-        elif systolic_bp >= 110 and diastolic_bp >= 70:  # normal
-            bp_factor = 1.0
-            bp_category = "normal"
-        elif systolic_bp < 100 or diastolic_bp < 60:  # low
-            # Low blood pressure can also affect kidney perfusion
-            bp_factor = 0.96
-            bp_category = "low"
-        else:
-            bp_factor = 1.0
-            bp_category = "normal"
+        bp_factor, bp_category = _classify_blood_pressure(systolic_bp, diastolic_bp)
         
         # Advanced symptom analysis with interconnected effects
         # Pain, stress and fatigue interact - research shows compound effects
@@ -119,15 +244,8 @@ def estimate_gfr_score(
         
         # Calculate interactions between symptoms (compounding effects)
         # High levels of multiple symptoms have synergistic negative effects
-        interaction_factor = 0
-        if stress > 7 and fatigue > 7:
-            interaction_factor += 0.03
-        if pain > 7 and stress > 7:
-            interaction_factor += 0.02
-        if pain > 7 and fatigue > 7:
-            interaction_factor += 0.02
-        if stress > 7 and fatigue > 7 and pain > 7:
-            interaction_factor += 0.03  # additional impact when all three are high
+        mask = (stress > 7) | ((fatigue > 7) << 1) | ((pain > 7) << 2)
+        interaction_factor = _SYMPTOM_INTERACTION[mask]
             
         symptom_score = weighted_stress + weighted_fatigue + weighted_pain + interaction_factor
         symptom_factor = 1.0 - (symptom_score * 0.18)  # Increased from 15% to 18% max reduction
@@ -185,21 +303,222 @@ def estimate_gfr_score(
         elif confidence_score < 0.6:
             confidence_level = "moderate-low"
         
-        result = {
-            "gfr_estimate": round(estimated_gfr, 1),
-            "method": "symptom-and-vital-based",
-            "confidence": confidence_level,
-            "calculation": "Enhanced ML model approximation",
-            "confidence_score": round(confidence_score * 100)  # Return confidence as percentage
-        }
+        result = GfrResult(
+            gfr_estimate=_round1(estimated_gfr),
+            method="symptom-and-vital-based",
+            confidence=confidence_level,
+            calculation="Enhanced ML model approximation",
+            confidence_score=round(confidence_score * 100)  # Return confidence as percentage
+        )
     
     # Add trend analysis if previous readings are available
     if previous_gfr_readings and len(previous_gfr_readings) > 0:
-        trend_result = analyze_gfr_trend(result["gfr_estimate"], previous_gfr_readings)
+        trend_result = analyze_gfr_trend(result.gfr_estimate, previous_gfr_readings)
         result.update(trend_result)
-    
+
     return result
 
+@lru_cache(maxsize=8192)
+def _parse_reading_date(date_str: str) -> Optional[datetime]:
+    """
+    Parse a reading timestamp with the C-level ISO-8601 parser.
+
+    Normalizes the trailing 'Z' and truncates fractional seconds beyond
+    microseconds so fromisoformat handles every format the old strptime
+    fallback did, without its state-machine overhead. Returns None for
+    strings that still fail, letting callers skip the reading. Memoized
+    since histories repeat the same timestamps across calls.
+    """
+    iso = date_str[:-1] + '+00:00' if date_str.endswith('Z') else date_str
+    try:
+        return datetime.fromisoformat(iso)
+    except ValueError:
+        dot = iso.find('.')
+        if dot != -1:
+            frac_end = dot + 1
+            while frac_end < len(iso) and iso[frac_end].isdigit():
+                frac_end += 1
+            trimmed = iso[:min(frac_end, dot + 7)] + iso[frac_end:]
+            try:
+                return datetime.fromisoformat(trimmed)
+            except ValueError:
+                return None
+        return None
+
+def _coerce_readings(previous_readings) -> List[float]:
+    """
+    Normalize a reading history to plain GFR values ordered newest-first.
+
+    Accepts the usual list of reading dicts, or - as a fast path for batch
+    analytics - a (gfr_values, dates) pair of parallel arrays, which skips
+    the per-dict validation and date parsing entirely (structure-of-arrays
+    instead of a list of per-reading dicts).
+    """
+    if isinstance(previous_readings, tuple) and len(previous_readings) == 2:
+        gfrs, dates = previous_readings
+        order = np.argsort(np.asarray(dates))[::-1]
+        return [float(g) for g in np.asarray(gfrs, dtype=np.float64)[order]]
+
+    # Extract GFR values and dates with validation
+    reading_data = []
+    for reading in previous_readings:
+        gfr = reading.get('estimatedGFR')
+        date_str = reading.get('date')
+
+        if gfr is not None and date_str is not None:
+            # Convert string date to datetime if it's a string; a None
+            # parse means the entry is invalid and gets skipped
+            date = _parse_reading_date(date_str) if isinstance(date_str, str) else date_str
+            if date is not None:
+                reading_data.append({"gfr": gfr, "date": date})
+
+    # Single sort on the parsed timestamps (newest to oldest); sorting the
+    # raw strings first was redundant since this ordering is authoritative
+    reading_data.sort(key=itemgetter("date"), reverse=True)
+    return [reading["gfr"] for reading in reading_data]
+
+def estimate_gfr_score_batch(
+    ages,
+    genders,
+    creatinines=None,
+    weights_kg=None,
+    heights_cm=None,
+    hydration_levels=None,
+    systolic_bps=None,
+    diastolic_bps=None,
+    stress_levels=None,
+    fatigue_levels=None,
+    pain_levels=None
+) -> np.ndarray:
+    """
+    Vectorized GFR estimation for cohort-scale batch scoring.
+
+    Computes the same per-patient estimates as estimate_gfr_score over NumPy
+    arrays: rows with a usable creatinine take the CKD-EPI 2021 path, and -
+    when the vitals arrays are supplied - the remaining rows take the
+    symptom-and-vital approximation, all as C-level array operations instead
+    of a Python loop per patient.
+
+    Args:
+        ages: Array of patient ages in years
+        genders: Array of gender strings ('female' / 'male')
+        creatinines: Optional array of serum creatinine values in mg/dL
+        weights_kg ... pain_levels: Optional vitals arrays matching the
+            scalar API; all eight must be provided together
+
+    Returns:
+        Array of GFR estimates rounded to one decimal; rows with neither a
+        usable creatinine nor the vitals come back as NaN
+    """
+    ages = np.asarray(ages, dtype=np.float64)
+    is_female = np.char.lower(np.asarray(genders, dtype=str)) == 'female'
+    gfr = np.full(ages.shape, np.nan)
+    has_creatinine = np.zeros(ages.shape, dtype=bool)
+
+    # Method 1: CKD-EPI 2021 for rows with a usable creatinine value
+    if creatinines is not None:
+        creatinines = np.asarray(creatinines, dtype=np.float64)
+        has_creatinine = ~np.isnan(creatinines) & (creatinines > 0)
+
+        # Gender-specific kappa and low-creatinine exponent from CKD-EPI 2021
+        k = np.where(is_female, 0.7, 0.9)
+        alpha = np.where(is_female, -0.241, -0.302)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratio = creatinines / k
+            exponent = np.where(ratio <= 1, alpha, -1.200)
+            cr_gfr = 142 * np.power(ratio, exponent) * np.exp(ages * _LN_0_9938)
+
+        # Cap maximum GFR value at 120
+        gfr = np.where(has_creatinine, np.minimum(cr_gfr, 120), np.nan)
+
+    # Method 2: symptom-and-vital approximation for the remaining rows
+    vitals = (weights_kg, heights_cm, hydration_levels, systolic_bps,
+              diastolic_bps, stress_levels, fatigue_levels, pain_levels)
+    if all(v is not None for v in vitals):
+        weights = np.asarray(weights_kg, dtype=np.float64)
+        heights = np.asarray(heights_cm, dtype=np.float64)
+        hydration = np.asarray(hydration_levels, dtype=np.float64)
+        systolic = np.asarray(systolic_bps, dtype=np.float64)
+        diastolic = np.asarray(diastolic_bps, dtype=np.float64)
+        stress = np.asarray(stress_levels, dtype=np.float64)
+        fatigue = np.asarray(fatigue_levels, dtype=np.float64)
+        pain = np.asarray(pain_levels, dtype=np.float64)
+
+        gender_factor = np.where(is_female, 0.85, 1.0)
+        bsa = 0.007184 * heights ** 0.725 * weights ** 0.425
+        bmi = weights / ((heights / 100) ** 2)
+
+        # Same buckets as the scalar path, found in one vectorized search
+        bmi_factor = np.asarray(_BMI_FACTORS)[np.searchsorted(_BMI_EDGES, bmi, side='right')]
+
+        hydration_factor = np.select(
+            [hydration <= 3, hydration <= 6],
+            [0.75 + hydration * 0.05, 0.90 + (hydration - 3) * 0.025],
+            default=0.975 + (hydration - 6) * 0.00625
+        )
+
+        # np.select picks the first true condition, mirroring the if/elif
+        # ordering of the scalar blood-pressure ladder
+        bp_factor = np.select(
+            [
+                (systolic >= 180) | (diastolic >= 120),  # crisis
+                (systolic >= 160) | (diastolic >= 100),  # stage 2
+                (systolic >= 140) | (diastolic >= 90),   # stage 1
+                (systolic >= 130) | (diastolic >= 85),   # elevated
+                (systolic >= 110) & (diastolic >= 70),   # normal
+                (systolic < 100) | (diastolic < 60),     # low
+            ],
+            [0.75, 0.82, 0.88, 0.94, 1.0, 0.96],
+            default=1.0
+        )
+
+        interaction = (
+            0.03 * ((stress > 7) & (fatigue > 7))
+            + 0.02 * ((pain > 7) & (stress > 7))
+            + 0.02 * ((pain > 7) & (fatigue > 7))
+            + 0.03 * ((stress > 7) & (fatigue > 7) & (pain > 7))
+        )
+        symptom_score = (stress / 10) * 0.35 + (fatigue / 10) * 0.35 + (pain / 10) * 0.30 + interaction
+        symptom_factor = 1.0 - (symptom_score * 0.18)
+
+        baseline_gfr = np.select(
+            [ages < 30, ages < 40, ages < 50, ages < 60, ages < 70, ages < 80],
+            [
+                120 - (ages * 0.09),
+                117.3 - ((ages - 30) * 0.15),
+                115.8 - ((ages - 40) * 0.33),
+                112.5 - ((ages - 50) * 0.54),
+                107.1 - ((ages - 60) * 0.78),
+                99.3 - ((ages - 70) * 0.95),
+            ],
+            default=89.8 - ((ages - 80) * 1.1)
+        )
+
+        bsa_factor = (bsa / 1.73) ** 0.4
+        estimated = baseline_gfr * gender_factor * bmi_factor * hydration_factor * bp_factor * symptom_factor * bsa_factor
+        estimated = np.maximum(np.minimum(estimated, 120), 15)
+
+        gfr = np.where(has_creatinine, gfr, estimated)
+
+    # Same half-up rounding as the scalar _round1 so batch and scalar agree
+    return np.floor(gfr * 10.0 + 0.5) / 10.0
+
+# Percent-change trend buckets for analyze_gfr_trend, mildest last for the
+# declines and mildest first for the improvements so a threshold bisect
+# lands on the right entry; the stable band is handled before the lookup
+_DECLINE_TRENDS = (
+    ("severe_decline", "Your GFR shows a significant drop from your last reading"),
+    ("moderate_decline", "Your GFR shows a moderate decline from your last reading"),
+    ("slight_decline", "Your GFR shows a slight decline from your last reading"),
+)
+_IMPROVEMENT_TRENDS = (
+    ("slight_improvement", "Your GFR shows slight improvement from your last reading"),
+    ("moderate_improvement", "Your GFR shows moderate improvement from your last reading"),
+    ("significant_improvement", "Your GFR shows significant improvement from your last reading"),
+)
+
+
 def analyze_gfr_trend(current_gfr: float, previous_readings: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Enhanced GFR trend analysis with advanced pattern detection and rate-of-change analysis.
@@ -211,128 +530,82 @@ def analyze_gfr_trend(current_gfr: float, previous_readings: List[Dict[str, Any]
     Returns:
         Dictionary with comprehensive trend analysis including rate of change and pattern detection
     """
-    if not previous_readings or len(previous_readings) == 0:
+    if previous_readings is None or len(previous_readings) == 0:
         return {
             "trend": "insufficient_data",
             "trend_description": "Insufficient data for trend analysis"
         }
-    
-    # Sort readings by date (most recent first)
-    sorted_readings = sorted(previous_readings, key=lambda x: x.get('date', ''), reverse=True)
-    
-    # Extract GFR values and dates with validation
-    reading_data = []
-    for reading in sorted_readings:
-        gfr = reading.get('estimatedGFR')
-        date_str = reading.get('date')
-        
-        if gfr is not None and date_str is not None:
-            try:
-                # Convert string date to datetime if it's a string
-                if isinstance(date_str, str):
-                    from datetime import datetime
-                    try:
-                        # Try ISO format first
-                        date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                    except:
-                        # Fall back to common format
-                        date = datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%S.%fZ")
-                else:
-                    date = date_str  # Assume it's already a datetime
-                
-                reading_data.append({"gfr": gfr, "date": date})
-            except Exception:
-                # Skip invalid entries
-                continue
-    
-    if not reading_data:
+
+    recent_readings = _coerce_readings(previous_readings)
+
+    if not recent_readings:
         return {
             "trend": "insufficient_data",
             "trend_description": "No valid previous GFR readings found"
         }
-    
-    # Re-sort by date for calculations (newest to oldest)
-    reading_data.sort(key=lambda x: x["date"], reverse=True)
-    
-    # Extract just the GFR values in chronological order (oldest to newest for analysis)
-    recent_readings = [reading["gfr"] for reading in reading_data]
-    recent_readings_reversed = list(reversed(recent_readings))
-    
+
+    # Single ndarray conversion shared by every metric below (average, slope,
+    # variability and pattern counting) instead of one per computation
+    readings_arr = np.asarray(recent_readings, dtype=np.float64)
+
     # Calculate absolute and percentage changes from most recent reading
     latest_previous = recent_readings[0]
     absolute_change = current_gfr - latest_previous
     percent_change = (absolute_change / latest_previous) * 100 if latest_previous > 0 else 0
-    
+
     # Calculate rate of change metrics
-    avg_recent = sum(recent_readings[:3]) / min(3, len(recent_readings))
+    avg_recent = float(readings_arr[:3].mean())
     avg_change = current_gfr - avg_recent
-    
+
     # Calculate slope of GFR change (linear regression) if enough data points
     slope = 0
     if len(recent_readings) >= 3:
         try:
-            # Simple linear regression to get slope (rate of change)
-            x = list(range(len(recent_readings_reversed)))
-            y = recent_readings_reversed
-            n = len(x)
-            
-            # Calculate the slope using the formula: slope = (n*sum(xy) - sum(x)*sum(y)) / (n*sum(x^2) - (sum(x))^2)
-            sum_x = sum(x)
-            sum_y = sum(y)
-            sum_xy = sum(xi * yi for xi, yi in zip(x, y))
-            sum_xx = sum(xi * xi for xi in x)
-            
+            # Closed-form least-squares slope computed with NumPy array ops -
+            # one C-level pass over the readings instead of four Python sum()
+            # loops: slope = (n*sum(xy) - sum(x)*sum(y)) / (n*sum(x^2) - (sum(x))^2)
+            # The readings are newest-first; fitting against that ordering and
+            # negating gives the chronological slope without a reversed copy
+            y = readings_arr
+            n = y.size
+            x = np.arange(n, dtype=np.float64)
+
+            sum_x = x.sum()
+            sum_y = y.sum()
+            sum_xy = (x * y).sum()
+            sum_xx = (x * x).sum()
+
             denominator = n * sum_xx - sum_x * sum_x
             if denominator != 0:  # Avoid division by zero
-                slope = (n * sum_xy - sum_x * sum_y) / denominator
+                slope = -float((n * sum_xy - sum_x * sum_y) / denominator)
         except Exception:
             # Fall back to simple calculation if there's an error
-            slope = (recent_readings_reversed[-1] - recent_readings_reversed[0]) / (len(recent_readings_reversed) - 1)
+            slope = (recent_readings[0] - recent_readings[-1]) / (len(recent_readings) - 1)
     
-    # Enhanced trend categorization with finer granularity
+    # Enhanced trend categorization with finer granularity; bisect over the
+    # percent-change thresholds replaces the seven-way comparison ladder
     if abs(percent_change) < 3:
         trend = "stable"
         description = "Your GFR appears stable compared to your last reading"
-    elif percent_change < -15:
-        trend = "severe_decline"
-        description = "Your GFR shows a significant drop from your last reading"
-    elif percent_change < -7:
-        trend = "moderate_decline"
-        description = "Your GFR shows a moderate decline from your last reading"
     elif percent_change < 0:
-        trend = "slight_decline"
-        description = "Your GFR shows a slight decline from your last reading"
-    elif percent_change > 15:
-        trend = "significant_improvement"
-        description = "Your GFR shows significant improvement from your last reading"
-    elif percent_change > 7:
-        trend = "moderate_improvement"
-        description = "Your GFR shows moderate improvement from your last reading"
+        trend, description = _DECLINE_TRENDS[bisect_right((-15, -7), percent_change)]
     else:
-        trend = "slight_improvement"
-        description = "Your GFR shows slight improvement from your last reading"
+        trend, description = _IMPROVEMENT_TRENDS[bisect_left((7, 15), percent_change)]
     
-    # Calculate variability (standard deviation)
+    # Calculate variability (standard deviation) in a single C-level pass
+    # instead of separate Python loops for the mean and the variance
     variability = 0
     if len(recent_readings) >= 3:
-        mean = sum(recent_readings) / len(recent_readings)
-        variance = sum((x - mean) ** 2 for x in recent_readings) / len(recent_readings)
-        variability = variance ** 0.5  # Standard deviation
-    
+        variability = float(readings_arr.std())
+
     # Detect patterns in the readings
     pattern = "unknown"
     pattern_confidence = 0.0
-    
+
     if len(recent_readings) >= 5:
-        # Check for consistent patterns
-        ups = 0
-        downs = 0
-        for i in range(len(recent_readings) - 1):
-            if recent_readings[i] > recent_readings[i+1]:
-                ups += 1
-            elif recent_readings[i] < recent_readings[i+1]:
-                downs += 1
-        
+        # Check for consistent patterns (counted in the compiled kernel)
+        ups, downs, alternating = _count_patterns(readings_arr)
+
         total_changes = ups + downs
         if total_changes > 0:
             # Calculate pattern consistency
@@ -347,12 +620,6 @@ def analyze_gfr_trend(current_gfr: float, previous_readings: List[Dict[str, Any]
                 pattern_confidence = 0.9
             else:
                 # Check for oscillating pattern (alternating ups and downs)
-                alternating = 0
-                for i in range(len(recent_readings) - 2):
-                    if (recent_readings[i] > recent_readings[i+1] and recent_readings[i+1] < recent_readings[i+2]) or \
-                       (recent_readings[i] < recent_readings[i+1] and recent_readings[i+1] > recent_readings[i+2]):
-                        alternating += 1
-                
                 if alternating >= (len(recent_readings) - 2) * 0.7:
                     pattern = "oscillating"
                     pattern_confidence = alternating / (len(recent_readings) - 2)
@@ -416,41 +683,57 @@ def analyze_gfr_trend(current_gfr: float, previous_readings: List[Dict[str, Any]
         "data_points": len(recent_readings)
     }
 
+# CKD stage boundaries and the six fully-built interpretations, ordered to
+# line up with bisect_right over the boundaries (G5 below every threshold).
+# MappingProxyType keeps the shared results read-only so callers cannot
+# mutate them, and every call returns the same object with no allocation.
+_GFR_STAGE_EDGES = (15, 30, 45, 60, 90)
+_GFR_INTERPRETATIONS = tuple(
+    MappingProxyType({"stage": stage, "description": description})
+    for stage, description in (
+        ("G5", "Kidney failure"),
+        ("G4", "Severely decreased kidney function"),
+        ("G3b", "Moderately to severely decreased kidney function"),
+        ("G3a", "Mild to moderately decreased kidney function"),
+        ("G2", "Mildly decreased kidney function"),
+        ("G1", "Normal or high kidney function"),
+    )
+)
+
 # CKD Stage interpretation function
-def interpret_gfr(gfr: float) -> dict:
+def interpret_gfr(gfr: float) -> Mapping[str, str]:
     """
     Get interpretation of GFR value according to CKD stages
     """
-    if gfr >= 90:
-        return {
-            "stage": "G1",
-            "description": "Normal or high kidney function"
-        }
-    elif gfr >= 60:
-        return {
-            "stage": "G2",
-            "description": "Mildly decreased kidney function"
-        }
-    elif gfr >= 45:
-        return {
-            "stage": "G3a",
-            "description": "Mild to moderately decreased kidney function"
-        }
-    elif gfr >= 30:
-        return {
-            "stage": "G3b",
-            "description": "Moderately to severely decreased kidney function"
-        }
-    elif gfr >= 15:
-        return {
-            "stage": "G4",
-            "description": "Severely decreased kidney function"
-        }
-    else:
-        return {
-            "stage": "G5",
-            "description": "Kidney failure"
-        }
+    return _GFR_INTERPRETATIONS[bisect_right(_GFR_STAGE_EDGES, gfr)]
+
+# Stage boundary/label arrays for the vectorized form
+_GFR_STAGE_EDGES_ARR = np.asarray(_GFR_STAGE_EDGES, dtype=np.float64)
+_GFR_STAGE_LABELS = np.array([entry["stage"] for entry in _GFR_INTERPRETATIONS])
+
+def interpret_gfr_batch(gfrs) -> np.ndarray:
+    """
+    Vectorized CKD staging: map an array of GFR values to stage labels.
+
+    One searchsorted over the same boundaries interpret_gfr uses, so a whole
+    reading history or cohort is staged in a single C call.
+    """
+    indices = np.searchsorted(_GFR_STAGE_EDGES_ARR, np.asarray(gfrs, dtype=np.float64), side='right')
+    return _GFR_STAGE_LABELS[indices]
+
+# Recommendation templates, ordered lowest GFR band first so a bisect over
+# the band edges picks the right one; the {disclaimer} slot reproduces the
+# original spacing exactly, including the double space when it is empty
+_RECOMMENDATION_EDGES = (15, 30, 60)
+_RECOMMENDATION_TEMPLATES = (
+    "Your kidney function appears to be in {stage} stage ({description}). {disclaimer} Please consult with your healthcare team about treatment options, which may include dialysis or transplantation.",
+    "Your kidney function appears to be in {stage} stage ({description}). {disclaimer} Close management by a nephrologist is important at this stage.",
+    "Your kidney function appears to be in {stage} stage ({description}). {disclaimer} Regular monitoring by a nephrologist is recommended.",
+    "Your kidney function appears to be in {stage} stage ({description}). {disclaimer} Continue to monitor your kidney health and follow a kidney-friendly lifestyle.",
+)
+
+_SYMPTOM_METHOD_DISCLAIMER = "This is an estimated value based on your symptoms and vitals. For a more accurate measurement, please consult your healthcare provider for a blood test."
+
 
 # Function to get recommendations based on GFR value
 def get_gfr_recommendation(gfr: float, method: str) -> str:
@@ -458,82 +741,86 @@ def get_gfr_recommendation(gfr: float, method: str) -> str:
     Get recommendations based on GFR value and calculation method
     """
     interpretation = interpret_gfr(gfr)
-    
+
     # Add disclaimer for symptom-based method
     method_disclaimer = ""
     if method == "symptom-and-vital-based":
-        method_disclaimer = "This is an estimated value based on your symptoms and vitals. For a more accurate measurement, please consult your healthcare provider for a blood test."
-    
-    if gfr >= 60:
-        return f"Your kidney function appears to be in {interpretation['stage']} stage ({interpretation['description']}). {method_disclaimer} Continue to monitor your kidney health and follow a kidney-friendly lifestyle."
-    elif gfr >= 30:
-        return f"Your kidney function appears to be in {interpretation['stage']} stage ({interpretation['description']}). {method_disclaimer} Regular monitoring by a nephrologist is recommended."
-    elif gfr >= 15:
-        return f"Your kidney function appears to be in {interpretation['stage']} stage ({interpretation['description']}). {method_disclaimer} Close management by a nephrologist is important at this stage."
-    else:
-        return f"Your kidney function appears to be in {interpretation['stage']} stage ({interpretation['description']}). {method_disclaimer} Please consult with your healthcare team about treatment options, which may include dialysis or transplantation."
-
-# Example with no creatinine (symptom-based)
-print("Example 1: Female patient with no creatinine value (symptom-based estimation)")
-result1 = estimate_gfr_score(
-    age=45,
-    gender='female',
-    weight_kg=68,
-    height_cm=165,
-    hydration_level=6,
-    systolic_bp=140,
-    diastolic_bp=85,
-    stress=7,
-    fatigue=8,
-    pain=4,
-    creatinine=None
-)
-print(f"GFR Estimate: {result1['gfr_estimate']} ml/min/1.73m²")
-print(f"Method: {result1['method']}")
-interpretation1 = interpret_gfr(result1['gfr_estimate'])
-print(f"Stage: {interpretation1['stage']} - {interpretation1['description']}")
-print(f"Recommendation: {get_gfr_recommendation(result1['gfr_estimate'], result1['method'])}")
-print()
-
-# Example with creatinine (lab-based)
-print("Example 2: Male patient with creatinine value (lab-based calculation)")
-result2 = estimate_gfr_score(
-    age=35,
-    gender='male',
-    weight_kg=70,
-    height_cm=175,
-    hydration_level=8,
-    systolic_bp=125,
-    diastolic_bp=80,
-    stress=5,
-    fatigue=6,
-    pain=3,
-    creatinine=1.3
-)
-print(f"GFR Estimate: {result2['gfr_estimate']} ml/min/1.73m²")
-print(f"Method: {result2['method']}")
-interpretation2 = interpret_gfr(result2['gfr_estimate'])
-print(f"Stage: {interpretation2['stage']} - {interpretation2['description']}")
-print(f"Recommendation: {get_gfr_recommendation(result2['gfr_estimate'], result2['method'])}")
-print()
-
-# Example for early stage CKD
-print("Example 3: Elderly female with early CKD")
-result3 = estimate_gfr_score(
-    age=72,
-    gender='female',
-    weight_kg=65,
-    height_cm=162,
-    hydration_level=7,
-    systolic_bp=145,
-    diastolic_bp=82,
-    stress=4,
-    fatigue=6,
-    pain=3,
-    creatinine=1.1
-)
-print(f"GFR Estimate: {result3['gfr_estimate']} ml/min/1.73m²")
-print(f"Method: {result3['method']}")
-interpretation3 = interpret_gfr(result3['gfr_estimate'])
-print(f"Stage: {interpretation3['stage']} - {interpretation3['description']}")
-print(f"Recommendation: {get_gfr_recommendation(result3['gfr_estimate'], result3['method'])}")
\ No newline at end of file
+        method_disclaimer = _SYMPTOM_METHOD_DISCLAIMER
+
+    template = _RECOMMENDATION_TEMPLATES[bisect_right(_RECOMMENDATION_EDGES, gfr)]
+    return template.format(
+        stage=interpretation['stage'],
+        description=interpretation['description'],
+        disclaimer=method_disclaimer
+    )
+
+def _demo():
+    """Run the worked examples when the module is executed directly."""
+    # Example with no creatinine (symptom-based)
+    print("Example 1: Female patient with no creatinine value (symptom-based estimation)")
+    result1 = estimate_gfr_score(
+        age=45,
+        gender='female',
+        weight_kg=68,
+        height_cm=165,
+        hydration_level=6,
+        systolic_bp=140,
+        diastolic_bp=85,
+        stress=7,
+        fatigue=8,
+        pain=4,
+        creatinine=None
+    )
+    print(f"GFR Estimate: {result1['gfr_estimate']} ml/min/1.73m²")
+    print(f"Method: {result1['method']}")
+    interpretation1 = interpret_gfr(result1['gfr_estimate'])
+    print(f"Stage: {interpretation1['stage']} - {interpretation1['description']}")
+    print(f"Recommendation: {get_gfr_recommendation(result1['gfr_estimate'], result1['method'])}")
+    print()
+
+    # Example with creatinine (lab-based)
+    print("Example 2: Male patient with creatinine value (lab-based calculation)")
+    result2 = estimate_gfr_score(
+        age=35,
+        gender='male',
+        weight_kg=70,
+        height_cm=175,
+        hydration_level=8,
+        systolic_bp=125,
+        diastolic_bp=80,
+        stress=5,
+        fatigue=6,
+        pain=3,
+        creatinine=1.3
+    )
+    print(f"GFR Estimate: {result2['gfr_estimate']} ml/min/1.73m²")
+    print(f"Method: {result2['method']}")
+    interpretation2 = interpret_gfr(result2['gfr_estimate'])
+    print(f"Stage: {interpretation2['stage']} - {interpretation2['description']}")
+    print(f"Recommendation: {get_gfr_recommendation(result2['gfr_estimate'], result2['method'])}")
+    print()
+
+    # Example for early stage CKD
+    print("Example 3: Elderly female with early CKD")
+    result3 = estimate_gfr_score(
+        age=72,
+        gender='female',
+        weight_kg=65,
+        height_cm=162,
+        hydration_level=7,
+        systolic_bp=145,
+        diastolic_bp=82,
+        stress=4,
+        fatigue=6,
+        pain=3,
+        creatinine=1.1
+    )
+    print(f"GFR Estimate: {result3['gfr_estimate']} ml/min/1.73m²")
+    print(f"Method: {result3['method']}")
+    interpretation3 = interpret_gfr(result3['gfr_estimate'])
+    print(f"Stage: {interpretation3['stage']} - {interpretation3['description']}")
+    print(f"Recommendation: {get_gfr_recommendation(result3['gfr_estimate'], result3['method'])}")
+
+
+if __name__ == "__main__":
+    _demo()
\ No newline at end of file
@@ -13,10 +13,35 @@ Key features:
 - Ensures responses are backed by vetted information
 """
 
+import heapq
 import os
 import json
+import random
+import re
+import threading
 import time
-from typing import Dict, List, Any, Optional
+
+# orjson parses the multi-KB JSON payloads LLMs return several times faster
+# than the stdlib json module; fall back silently when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _json_loads(payload):
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+def _json_dumps(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
 
 # Import AI provider libraries with error handling
 try:
@@ -26,13 +51,6 @@ except ImportError:
     OPENAI_AVAILABLE = False
     print("⚠️ OpenAI library not found")
 
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
-    print("⚠️ Google Generative AI library not found")
-
 try:
     import requests
     PERPLEXITY_AVAILABLE = True
@@ -40,13 +58,9 @@ except ImportError:
     PERPLEXITY_AVAILABLE = False
     print("⚠️ Requests library not found (needed for Perplexity API)")
 
-# Import database connection
-try:
-    from supabase import create_client, Client
-    SUPABASE_AVAILABLE = True
-except ImportError:
-    SUPABASE_AVAILABLE = False
-    print("⚠️ Supabase library not found")
+# google.generativeai and supabase drag in large dependency trees (grpc,
+# protobuf, httpx), so they are imported lazily on first use instead of at
+# module import - a run that only needs OpenAI never pays their cold start
 
 # Load environment variables
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -56,62 +70,236 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
 
 # Initialize clients
-if SUPABASE_AVAILABLE and SUPABASE_URL and SUPABASE_KEY:
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-else:
-    supabase = None
-    print("⚠️ Supabase client not initialized - check URL and KEY")
-
 if OPENAI_AVAILABLE and OPENAI_API_KEY:
     openai.api_key = OPENAI_API_KEY
 else:
     print("⚠️ OpenAI not initialized - check API key")
 
-if GEMINI_AVAILABLE and GEMINI_API_KEY:
+@lru_cache(maxsize=1)
+def _get_genai():
+    """Import and configure google.generativeai on first use; None when unavailable"""
+    if not GEMINI_API_KEY:
+        print("⚠️ Gemini not initialized - check API key")
+        return None
+    try:
+        import google.generativeai as genai
+    except ImportError:
+        print("⚠️ Google Generative AI library not found")
+        return None
     genai.configure(api_key=GEMINI_API_KEY)
-else:
-    print("⚠️ Gemini not initialized - check API key")
+    return genai
+
+@lru_cache(maxsize=1)
+def _get_supabase():
+    """Create the Supabase client on first use; None when unavailable"""
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        print("⚠️ Supabase client not initialized - check URL and KEY")
+        return None
+    try:
+        from supabase import create_client
+    except ImportError:
+        print("⚠️ Supabase library not found")
+        return None
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+# Shared HTTP session so repeated Perplexity calls reuse keep-alive
+# connections instead of paying a TCP+TLS handshake per request. The
+# explicit adapter sizes the connection pool for concurrent provider
+# racing and retries transient transport failures at the urllib3 layer.
+def _build_http_session() -> "requests.Session":
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=3)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+_http_session = _build_http_session() if PERPLEXITY_AVAILABLE else None
+
+# Retrieval cache: common questions repeat ("foods to avoid", "symptoms of
+# CKD") while the article corpus changes slowly, so identical queries skip
+# the Supabase round-trip entirely for a few minutes. Entries keep the
+# query embedding alongside the articles so paraphrases ("what food should
+# I avoid" vs "foods to avoid") also hit via cosine similarity.
+_ARTICLE_CACHE: Dict[Tuple[str, int], Tuple[float, List[Dict[str, Any]]]] = {}
+_ARTICLE_CACHE_TTL_SECONDS = 600
+_ARTICLE_CACHE_MAX_ENTRIES = 1024
+_ARTICLE_SIMILARITY_THRESHOLD = 0.92
+_article_cache_lock = threading.Lock()
+_article_embeddings: Optional[np.ndarray] = None
+_article_embed_entries: List[Tuple[float, int, List[Dict[str, Any]]]] = []
+
+def _normalize_query(query: str) -> str:
+    """Collapse punctuation and case so trivially different queries share a cache entry"""
+    return re.sub(r'\W+', ' ', query.lower()).strip()
 
-def get_relevant_articles(query: str, limit: int = 5) -> List[Dict[str, Any]]:
-    """Fetch relevant articles from the database based on the user query"""
+# Tokenized (title, summary, content) sets per article, invalidated when the
+# row's publish_date changes (the only timestamp education_resources rows
+# carry - see shared/schema.ts); tokenizing large content fields dominates
+# the fallback scoring cost, so it should only happen once per article version
+_TOKEN_CACHE: Dict[Any, Tuple[Any, Tuple[set, set, set]]] = {}
+
+def _article_token_sets(article: Dict[str, Any]) -> Tuple[set, set, set]:
+    article_id = article.get("id")
+    stamp = article.get("publish_date")
+    if article_id is not None:
+        cached = _TOKEN_CACHE.get(article_id)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+    token_sets = (
+        set(re.findall(r'\w+', article.get("title", "").lower())),
+        set(re.findall(r'\w+', article.get("summary", "").lower())),
+        set(re.findall(r'\w+', article.get("content", "").lower())),
+    )
+    if article_id is not None:
+        _TOKEN_CACHE[article_id] = (stamp, token_sets)
+    return token_sets
+
+def _article_cache_similar(vec: np.ndarray, limit: int, now: float) -> Optional[List[Dict[str, Any]]]:
+    """Cached articles for a semantically close enough prior query, else None"""
+    with _article_cache_lock:
+        if _article_embeddings is None or not len(_article_embed_entries):
+            return None
+        scores = _article_embeddings @ vec
+        best = int(np.argmax(scores))
+        stamp, entry_limit, articles = _article_embed_entries[best]
+        if (float(scores[best]) >= _ARTICLE_SIMILARITY_THRESHOLD
+                and entry_limit == limit
+                and now - stamp < _ARTICLE_CACHE_TTL_SECONDS):
+            return articles
+    return None
+
+def _article_cache_store_embedding(vec: np.ndarray, limit: int, articles: List[Dict[str, Any]], now: float) -> None:
+    global _article_embeddings
+    with _article_cache_lock:
+        if _article_embeddings is None:
+            _article_embeddings = vec.reshape(1, -1)
+            _article_embed_entries[:] = [(now, limit, articles)]
+            return
+        if len(_article_embed_entries) >= _ARTICLE_CACHE_MAX_ENTRIES:
+            _article_embeddings = _article_embeddings[1:]
+            del _article_embed_entries[0]
+        _article_embeddings = np.vstack((_article_embeddings, vec))
+        _article_embed_entries.append((now, limit, articles))
+
+def get_relevant_articles(query: str, limit: int = 5,
+                          query_vector: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+    """
+    Fetch relevant articles from the database based on the user query.
+
+    Callers that already embedded the query (get_ai_response does, for its
+    semantic cache) pass the vector in so it isn't computed twice.
+    """
+    cache_key = (_normalize_query(query), limit)
+    now = time.monotonic()
+    with _article_cache_lock:
+        cached = _ARTICLE_CACHE.get(cache_key)
+        if cached is not None and now - cached[0] < _ARTICLE_CACHE_TTL_SECONDS:
+            return cached[1]
+
+    # Exact-key miss: a paraphrase of an already-answered query can still
+    # hit via embedding similarity before touching Supabase
+    vec = query_vector if query_vector is not None else _embed_query(query)
+    if vec is not None:
+        similar = _article_cache_similar(vec, limit, now)
+        if similar is not None:
+            return similar
+
+    articles = _fetch_relevant_articles(query, limit, vec)
+
+    if articles:
+        with _article_cache_lock:
+            if len(_ARTICLE_CACHE) >= _ARTICLE_CACHE_MAX_ENTRIES:
+                # Evict the stalest entry rather than grow without bound
+                oldest = min(_ARTICLE_CACHE, key=lambda k: _ARTICLE_CACHE[k][0])
+                del _ARTICLE_CACHE[oldest]
+            _ARTICLE_CACHE[cache_key] = (now, articles)
+        if vec is not None:
+            _article_cache_store_embedding(vec, limit, articles, now)
+    return articles
+
+def get_relevant_articles_batch(queries: List[str], limit: int = 5) -> List[List[Dict[str, Any]]]:
+    """
+    Retrieve articles for several queries in one call, in input order.
+
+    Cache hits are served as usual and the misses overlap their Supabase
+    round-trips in a thread pool, so draining a queue of user messages
+    costs roughly one retrieval latency instead of one per query.
+    """
+    if not queries:
+        return []
+    with ThreadPoolExecutor(max_workers=min(8, len(queries))) as executor:
+        return list(executor.map(lambda q: get_relevant_articles(q, limit), queries))
+
+def _fetch_relevant_articles(query: str, limit: int,
+                             query_vector: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+    """Uncached retrieval: pgvector kNN, then full-text search, then a Python keyword fallback"""
+    supabase = _get_supabase()
     if not supabase:
         print("❌ Supabase client not available")
         return []
-    
+
+    if query_vector is not None:
+        try:
+            # Best path: the embedding computed for the caches doubles as a
+            # pgvector kNN query (see education_resources_vector_search.sql),
+            # so paraphrases retrieve well without any keyword overlap
+            response = supabase.rpc(
+                "match_education_resources",
+                {"query_embedding": query_vector.tolist(), "match_count": limit}
+            ).execute()
+            if hasattr(response, 'data') and response.data:
+                print(f"✅ Found {len(response.data)} relevant articles for query: '{query}'")
+                return response.data
+        except Exception as e:
+            print(f"⚠️ Vector search unavailable, falling back to full-text search: {e}")
+
     try:
-        # In a real implementation, this would use full-text search or embeddings
-        # This simplified version just searches for keywords
-        keywords = query.lower().split()
+        # Preferred path: rank and limit inside Postgres via the GIN-indexed
+        # tsvector column (see education_resources_search.sql) instead of
+        # pulling every row and scoring it in Python
+        response = supabase.rpc(
+            "search_education_resources",
+            {"search_query": query, "max_results": limit}
+        ).execute()
+        if hasattr(response, 'data') and response.data:
+            print(f"✅ Found {len(response.data)} relevant articles for query: '{query}'")
+            return response.data
+    except Exception as e:
+        print(f"⚠️ Full-text search unavailable, falling back to keyword scan: {e}")
+
+    try:
+        # Fallback: keyword scan in Python for databases without the search
+        # function installed. The query is tokenized once and scored by set
+        # intersection against per-article token sets, instead of substring-
+        # scanning kilobytes of content per keyword.
+        query_terms = set(re.findall(r'\w+', query.lower()))
         results = []
-        
+
         # Get all education resources
         response = supabase.table("education_resources").select("*").execute()
-        
+
         if hasattr(response, 'data'):
             articles = response.data
-            
+
             # Score articles based on keyword matches
             scored_articles = []
             for article in articles:
-                score = 0
-                title = article.get("title", "").lower()
-                content = article.get("content", "").lower()
-                summary = article.get("summary", "").lower()
-                
-                for keyword in keywords:
-                    if keyword in title:
-                        score += 3
-                    if keyword in summary:
-                        score += 2
-                    if keyword in content:
-                        score += 1
-                
+                title_terms, summary_terms, content_terms = _article_token_sets(article)
+                score = (
+                    3 * len(query_terms & title_terms)
+                    + 2 * len(query_terms & summary_terms)
+                    + len(query_terms & content_terms)
+                )
+
                 if score > 0:
                     scored_articles.append((score, article))
             
-            # Sort by score and take top results
-            scored_articles.sort(reverse=True, key=lambda x: x[0])
-            results = [article for _, article in scored_articles[:limit]]
+            # Take the top results without sorting the whole list -
+            # O(N log K) instead of O(N log N)
+            top_articles = heapq.nlargest(limit, scored_articles, key=lambda x: x[0])
+            results = [article for _, article in top_articles]
             
             print(f"✅ Found {len(results)} relevant articles for query: '{query}'")
             return results
@@ -123,24 +311,85 @@ def get_relevant_articles(query: str, limit: int = 5) -> List[Dict[str, Any]]:
         print(f"❌ Error fetching articles: {e}")
         return []
 
+# Assembled context strings keyed by the tuple of article ids, so a cached
+# retrieval result doesn't rebuild the same context repeatedly
+_CONTEXT_CACHE: Dict[Tuple[Any, ...], str] = {}
+_CONTEXT_CACHE_MAX_ENTRIES = 256
+
+# One context entry per article; a module-level template plus a generator
+# feeding str.join avoids the intermediate list and per-iteration f-strings
+_CONTEXT_ENTRY_TEMPLATE = "[Article {i}] {title} (Source: {source})\n{body}\n"
+
 def create_context_from_articles(articles: List[Dict[str, Any]]) -> str:
     """Create a context string from relevant articles"""
     if not articles:
         return "No relevant information available."
-    
-    context_parts = []
-    
-    for i, article in enumerate(articles):
-        title = article.get("title", "Untitled")
-        source = article.get("source", "Unknown source")
-        summary = article.get("summary", "")
-        
-        # Use summary if available, otherwise use extract from content
-        content = summary or article.get("content", "")[:500] + "..."
-        
-        context_parts.append(f"[Article {i+1}] {title} (Source: {source})\n{content}\n")
-    
-    return "\n".join(context_parts)
+
+    cache_key = tuple(article.get("id") for article in articles)
+    cacheable = None not in cache_key
+    if cacheable:
+        cached = _CONTEXT_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+    # Use summary if available, otherwise use extract from content
+    context = "\n".join(
+        _CONTEXT_ENTRY_TEMPLATE.format(
+            i=i + 1,
+            title=article.get("title", "Untitled"),
+            source=article.get("source", "Unknown source"),
+            body=article.get("summary", "") or article.get("content", "")[:500] + "..."
+        )
+        for i, article in enumerate(articles)
+    )
+    if cacheable:
+        if len(_CONTEXT_CACHE) >= _CONTEXT_CACHE_MAX_ENTRIES:
+            _CONTEXT_CACHE.clear()
+        _CONTEXT_CACHE[cache_key] = context
+    return context
+
+# Grounding prompts shared by the providers, built once at import instead of
+# per call; a byte-stable system prefix also lets providers that cache prompt
+# prefixes reuse them across requests
+_SYSTEM_PROMPT = """You are a specialized medical AI assistant for Nephra, a kidney health app.
+Your responses must be based ONLY on the context provided. Do NOT include any information not in the context.
+If you don't have enough information in the context, say so - do NOT make up facts.
+Format your response in consumer-friendly plain language, making medical information accessible to patients.
+Include source reference numbers like [1] when appropriate."""
+
+_USER_PROMPT_TEMPLATE = """Question: {query}
+
+Context from verified medical sources:
+{context}
+
+Please answer based only on the context provided above."""
+
+# Static pieces of every Perplexity request, built once at import; each call
+# only adds the messages list
+_PERPLEXITY_HEADERS = {
+    "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
+    "Content-Type": "application/json"
+}
+_PERPLEXITY_PAYLOAD_BASE = {
+    "model": "llama-3.1-sonar-small-128k-online",
+    "max_tokens": 800,
+    "temperature": 0.5,
+    "stream": False
+}
+
+# Gemini takes a single combined prompt rather than a system/user pair
+_GEMINI_PROMPT_TEMPLATE = """You are a specialized medical AI assistant for Nephra, a kidney health app.
+Your responses must be based ONLY on the context provided below. Do NOT include any information not in the context.
+If you don't have enough information in the context, say so - do NOT make up facts.
+Format your response in consumer-friendly plain language, making medical information accessible to patients.
+Include source reference numbers like [1] when appropriate.
+
+Question: {query}
+
+Context from verified medical sources:
+{context}
+
+Please answer based only on the context provided above."""
 
 def generate_response_with_openai(query: str, context: str) -> Dict[str, Any]:
     """Generate a response using OpenAI with information from trusted sources"""
@@ -159,18 +408,8 @@ def generate_response_with_openai(query: str, context: str) -> Dict[str, Any]:
     
     try:
         # Construct prompt with context
-        system_prompt = """You are a specialized medical AI assistant for Nephra, a kidney health app.
-Your responses must be based ONLY on the context provided. Do NOT include any information not in the context.
-If you don't have enough information in the context, say so - do NOT make up facts.
-Format your response in consumer-friendly plain language, making medical information accessible to patients.
-Include source reference numbers like [1] when appropriate."""
-
-        user_prompt = f"""Question: {query}
-
-Context from verified medical sources:
-{context}
-
-Please answer based only on the context provided above."""
+        system_prompt = _SYSTEM_PROMPT
+        user_prompt = _USER_PROMPT_TEMPLATE.format(query=query, context=context)
 
         start_time = time.time()
         
@@ -229,54 +468,36 @@ def generate_response_with_perplexity(query: str, context: str) -> Dict[str, Any
         return result
     
     try:
-        system_prompt = """You are a specialized medical AI assistant for Nephra, a kidney health app.
-Your responses must be based ONLY on the context provided. Do NOT include any information not in the context.
-If you don't have enough information in the context, say so - do NOT make up facts.
-Format your response in consumer-friendly plain language, making medical information accessible to patients.
-Include source reference numbers like [1] when appropriate."""
-
-        user_prompt = f"""Question: {query}
-
-Context from verified medical sources:
-{context}
-
-Please answer based only on the context provided above."""
-        
-        headers = {
-            "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
-            "model": "llama-3.1-sonar-small-128k-online",
+            **_PERPLEXITY_PAYLOAD_BASE,
             "messages": [
                 {
                     "role": "system",
-                    "content": system_prompt
+                    "content": _SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
-                    "content": user_prompt
+                    "content": _USER_PROMPT_TEMPLATE.format(query=query, context=context)
                 }
-            ],
-            "max_tokens": 800,
-            "temperature": 0.5,
-            "stream": False
+            ]
         }
-        
+
         start_time = time.time()
-        
-        response = requests.post(
+
+        # Serialize the body ourselves so orjson handles it when available;
+        # the shared headers already declare application/json
+        response = _http_session.post(
             "https://api.perplexity.ai/chat/completions",
-            headers=headers,
-            json=payload
+            headers=_PERPLEXITY_HEADERS,
+            data=_json_dumps(payload),
+            timeout=30
         )
         
         end_time = time.time()
         result["time_ms"] = int((end_time - start_time) * 1000)
         
         if response.status_code == 200:
-            response_data = response.json()
+            response_data = _json_loads(response.content)
             result["model"] = response_data.get("model", "unknown")
             result["response"] = response_data.get("choices", [{}])[0].get("message", {}).get("content", "No content")
             result["success"] = True
@@ -300,24 +521,14 @@ def generate_response_with_gemini(query: str, context: str) -> Dict[str, Any]:
         "time_ms": 0
     }
     
-    if not GEMINI_AVAILABLE or not GEMINI_API_KEY:
+    genai = _get_genai()
+    if genai is None:
         result["error"] = "Google Generative AI not available"
         return result
-    
-    try:
-        prompt = f"""You are a specialized medical AI assistant for Nephra, a kidney health app.
-Your responses must be based ONLY on the context provided below. Do NOT include any information not in the context.
-If you don't have enough information in the context, say so - do NOT make up facts.
-Format your response in consumer-friendly plain language, making medical information accessible to patients.
-Include source reference numbers like [1] when appropriate.
-
-Question: {query}
 
-Context from verified medical sources:
-{context}
+    try:
+        prompt = _GEMINI_PROMPT_TEMPLATE.format(query=query, context=context)
 
-Please answer based only on the context provided above."""
-        
         start_time = time.time()
         
         # Try the latest model first
@@ -352,12 +563,251 @@ Please answer based only on the context provided above."""
     
     return result
 
+def stream_response_with_openai(query: str, context: str):
+    """
+    Yield response text chunks from OpenAI as they arrive.
+
+    The blocking generate_response_with_openai waits for the full completion
+    before returning; for chat UX the perceived latency is time-to-first-token,
+    so this variant streams the delta content for progressive display.
+    """
+    response = openai.chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {"role": "user", "content": _USER_PROMPT_TEMPLATE.format(query=query, context=context)}
+        ],
+        max_tokens=800,
+        temperature=0.5,
+        stream=True
+    )
+    for chunk in response:
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
+
+def stream_response_with_gemini(query: str, context: str):
+    """Yield response text chunks from Gemini as they arrive."""
+    genai = _get_genai()
+    if genai is None:
+        raise RuntimeError("Google Generative AI not available")
+    model = genai.GenerativeModel('gemini-1.5-pro')
+    response = model.generate_content(
+        _GEMINI_PROMPT_TEMPLATE.format(query=query, context=context),
+        generation_config={"temperature": 0.5, "max_output_tokens": 800},
+        stream=True
+    )
+    for chunk in response:
+        if chunk.text:
+            yield chunk.text
+
+# Providers raced by get_ai_response, in preference order (error labels
+# match the messages the sequential fallback used to produce)
+_RESPONSE_PROVIDERS = (
+    ("OpenAI", generate_response_with_openai),
+    ("Gemini", generate_response_with_gemini),
+    ("Perplexity", generate_response_with_perplexity),
+)
+
+# Once a lower-priority provider has answered, how long to keep waiting for
+# a higher-priority one before settling
+_PREFERRED_GRACE_SECONDS = 0.25
+
+# Hard ceiling on how long the race waits for any answer at all; a hung
+# provider must not hold the whole response path hostage
+_PROVIDER_TIMEOUT_SECONDS = 8.0
+
+# Per-provider circuit breaker: after enough consecutive failures a provider
+# is skipped for a cooldown window, so a provider that is down (rate-limited,
+# outage) costs nothing instead of a failed attempt on every request.
+_BREAKER_TRIP_FAILURES = 3
+_BREAKER_COOLDOWN_SECONDS = 30.0
+_breaker_lock = threading.Lock()
+_breaker_state: Dict[str, Dict[str, float]] = {}
+
+def _breaker_allows(name: str) -> bool:
+    with _breaker_lock:
+        state = _breaker_state.get(name)
+        return state is None or time.monotonic() >= state["open_until"]
+
+def _breaker_record(name: str, success: bool):
+    with _breaker_lock:
+        state = _breaker_state.setdefault(name, {"fails": 0, "open_until": 0.0})
+        if success:
+            state["fails"] = 0
+            state["open_until"] = 0.0
+        else:
+            state["fails"] += 1
+            if state["fails"] >= _BREAKER_TRIP_FAILURES:
+                state["open_until"] = time.monotonic() + _BREAKER_COOLDOWN_SECONDS
+                print(f"⚠️ {name} circuit opened for {_BREAKER_COOLDOWN_SECONDS:.0f}s after {state['fails']} consecutive failures")
+
+# Transient provider failures (rate limits, connection resets) often clear
+# on an immediate second attempt, so each racer retries once with jittered
+# backoff; sustained failure trips the circuit instead of burning retries.
+_PROVIDER_ATTEMPTS = 2
+_RETRY_BACKOFF_SECONDS = 0.5
+
+def _call_provider_with_retry(name: str, fn, query: str, context: str) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"success": False, "error": "No attempt made"}
+    for attempt in range(_PROVIDER_ATTEMPTS):
+        if attempt:
+            time.sleep(_RETRY_BACKOFF_SECONDS * (2 ** (attempt - 1)) * (1.0 + random.random()))
+        try:
+            result = fn(query, context)
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        if result.get("success"):
+            break
+    # Recording happens in the worker thread, so even a straggler the race
+    # abandoned still feeds the breaker when it eventually finishes
+    _breaker_record(name, bool(result.get("success")))
+    return result
+
+def _race_response_providers(query: str, context: str) -> tuple:
+    """
+    Run every provider concurrently and return (best_result, all_results).
+
+    The calls are pure network I/O, so racing them makes wall clock the
+    fastest provider's latency instead of the sum of the failed attempts;
+    preference order still wins via a short grace window, and the whole
+    race is capped at _PROVIDER_TIMEOUT_SECONDS.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    priority = {name: rank for rank, (name, _) in enumerate(_RESPONSE_PROVIDERS)}
+    best_rank = len(_RESPONSE_PROVIDERS)
+    best = None
+    candidates = [(name, fn) for name, fn in _RESPONSE_PROVIDERS if _breaker_allows(name)]
+    if not candidates:
+        # Every circuit is open; try them all rather than fail outright
+        candidates = list(_RESPONSE_PROVIDERS)
+    racing = {name for name, _ in candidates}
+    for name, _ in _RESPONSE_PROVIDERS:
+        if name not in racing:
+            results[name] = {"success": False,
+                             "error": f"Circuit open; cooling down for up to {_BREAKER_COOLDOWN_SECONDS:.0f}s"}
+    executor = ThreadPoolExecutor(max_workers=len(candidates))
+    try:
+        futures = {executor.submit(_call_provider_with_retry, name, fn, query, context): name
+                   for name, fn in candidates}
+        pending = set(futures)
+        hard_deadline = time.monotonic() + _PROVIDER_TIMEOUT_SECONDS
+        grace_deadline = None
+        while pending:
+            deadline = hard_deadline if grace_deadline is None else min(hard_deadline, grace_deadline)
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                # Grace window or hard deadline expired; record timeouts for
+                # whatever never answered and keep the best answer so far
+                for future in pending:
+                    results.setdefault(futures[future], {
+                        "success": False,
+                        "error": f"No response within {_PROVIDER_TIMEOUT_SECONDS:.0f}s"
+                    })
+                break
+            for future in done:
+                name = futures[future]
+                try:
+                    provider_result = future.result()
+                except Exception as e:
+                    provider_result = {"success": False, "error": str(e)}
+                results[name] = provider_result
+                if provider_result.get("success") and priority[name] < best_rank:
+                    best_rank = priority[name]
+                    best = provider_result
+                    grace_deadline = time.monotonic() + _PREFERRED_GRACE_SECONDS
+            if best is not None:
+                # Stop early once no pending provider outranks the winner
+                if not any(priority[futures[f]] < best_rank for f in pending):
+                    break
+    finally:
+        # Abandon stragglers instead of blocking on them; their threads
+        # finish in the background and the executor is reaped afterwards
+        executor.shutdown(wait=False, cancel_futures=True)
+    return best, results
+
+# Semantic response cache: many queries are paraphrases of already-answered
+# ones, so a stored query whose embedding is close enough short-circuits the
+# whole retrieval + LLM round-trip. Rows of the matrix are L2-normalized, so
+# a dot product is the cosine similarity. Entries expire on the same TTL as
+# the article cache (answers are built from that corpus) and the oldest one
+# is evicted at capacity, so the cache follows current traffic instead of
+# freezing on the first questions it saw.
+_SEMANTIC_CACHE_THRESHOLD = 0.92
+_SEMANTIC_CACHE_MAX_ENTRIES = 512
+_SEMANTIC_CACHE_TTL_SECONDS = _ARTICLE_CACHE_TTL_SECONDS
+_semantic_cache_lock = threading.Lock()
+_semantic_embeddings: Optional[np.ndarray] = None
+_semantic_entries: List[Tuple[float, Dict[str, Any]]] = []
+
+def _embed_query(query: str) -> Optional[np.ndarray]:
+    """L2-normalized embedding of a query, or None when embeddings are unavailable"""
+    if not OPENAI_AVAILABLE or not OPENAI_API_KEY:
+        return None
+    try:
+        response = openai.embeddings.create(
+            model="text-embedding-3-small",
+            input=_normalize_query(query)
+        )
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
+    except Exception as e:
+        print(f"⚠️ Query embedding failed: {e}")
+        return None
+
+def _semantic_cache_lookup(query_vector: np.ndarray) -> Optional[Dict[str, Any]]:
+    with _semantic_cache_lock:
+        if _semantic_embeddings is None or not _semantic_entries:
+            return None
+        similarities = _semantic_embeddings @ query_vector
+        best = int(np.argmax(similarities))
+        stamp, entry = _semantic_entries[best]
+        if (similarities[best] >= _SEMANTIC_CACHE_THRESHOLD
+                and time.monotonic() - stamp < _SEMANTIC_CACHE_TTL_SECONDS):
+            return entry
+    return None
+
+def _semantic_cache_store(query_vector: np.ndarray, entry: Dict[str, Any]):
+    global _semantic_embeddings
+    row = query_vector[np.newaxis, :]
+    now = time.monotonic()
+    with _semantic_cache_lock:
+        if _semantic_embeddings is None:
+            _semantic_embeddings = row
+            _semantic_entries[:] = [(now, entry)]
+            return
+        if len(_semantic_entries) >= _SEMANTIC_CACHE_MAX_ENTRIES:
+            # Evict the oldest entry rather than stop accepting new ones
+            _semantic_embeddings = _semantic_embeddings[1:]
+            del _semantic_entries[0]
+        _semantic_embeddings = np.vstack((_semantic_embeddings, row))
+        _semantic_entries.append((now, entry))
+
 def get_ai_response(query: str) -> Dict[str, Any]:
     """Get response from AI with fallback between providers"""
     print(f"🔍 Processing query: '{query}'")
+
+    # A close-enough previously answered question skips retrieval and the
+    # provider call entirely
+    query_vector = _embed_query(query)
+    if query_vector is not None:
+        cached = _semantic_cache_lookup(query_vector)
+        if cached is not None:
+            print("✅ Served from semantic response cache")
+            return {
+                "query": query,
+                "response": cached["response"],
+                "provider_used": cached["provider_used"],
+                "sources": cached["sources"],
+                "success": True,
+                "error": None
+            }
     
-    # Get contextual information from trusted sources
-    articles = get_relevant_articles(query)
+    # Get contextual information from trusted sources, reusing the embedding
+    # computed above instead of paying a second embeddings call
+    articles = get_relevant_articles(query, query_vector=query_vector)
     context = create_context_from_articles(articles)
     
     sources = []
@@ -381,41 +831,109 @@ def get_ai_response(query: str) -> Dict[str, Any]:
         result["error"] = "No relevant information found in our trusted sources database."
         return result
     
-    # Try OpenAI first
-    openai_result = generate_response_with_openai(query, context)
-    if openai_result["success"]:
-        result["response"] = openai_result["response"]
-        result["provider_used"] = f"OpenAI ({openai_result['model']})"
+    # Race the providers instead of walking the fallback chain serially
+    best, provider_results = _race_response_providers(query, context)
+    if best is not None:
+        result["response"] = best["response"]
+        result["provider_used"] = f"{best['provider']} ({best['model']})"
         result["success"] = True
+        if query_vector is not None:
+            _semantic_cache_store(query_vector, {
+                "response": result["response"],
+                "provider_used": result["provider_used"],
+                "sources": sources
+            })
         return result
-    
-    # Fallback to Gemini
-    gemini_result = generate_response_with_gemini(query, context)
-    if gemini_result["success"]:
-        result["response"] = gemini_result["response"]
-        result["provider_used"] = f"Google Gemini ({gemini_result['model']})"
-        result["success"] = True
-        return result
-    
-    # Fallback to Perplexity
-    perplexity_result = generate_response_with_perplexity(query, context)
-    if perplexity_result["success"]:
-        result["response"] = perplexity_result["response"]
-        result["provider_used"] = f"Perplexity ({perplexity_result['model']})"
-        result["success"] = True
-        return result
-    
+
     # All providers failed
     result["error"] = "All AI providers failed to generate a response."
-    if openai_result["error"]:
-        result["error"] += f" OpenAI: {openai_result['error']}"
-    if gemini_result["error"]:
-        result["error"] += f" Gemini: {gemini_result['error']}"
-    if perplexity_result["error"]:
-        result["error"] += f" Perplexity: {perplexity_result['error']}"
-    
+    for name, _ in _RESPONSE_PROVIDERS:
+        provider_error = provider_results.get(name, {}).get("error")
+        if provider_error:
+            result["error"] += f" {name}: {provider_error}"
+
     return result
 
+# Streaming providers tried in preference order by get_ai_response_stream
+_STREAM_PROVIDERS = (
+    ("OpenAI (gpt-4o)", "OpenAI", stream_response_with_openai),
+    ("Gemini (gemini-1.5-pro)", "Gemini", stream_response_with_gemini),
+)
+
+def get_ai_response_stream(query: str):
+    """
+    Yield an answer as text chunks, followed by one final metadata dict.
+
+    Same retrieval, caching and circuit-breaker behavior as get_ai_response,
+    but the response is forwarded chunk by chunk so the HTTP layer can relay
+    it as Server-Sent Events: the user sees progress at time-to-first-token
+    instead of waiting out the full completion. The closing dict carries
+    provider_used, sources, success and error.
+    """
+    print(f"🔍 Processing streaming query: '{query}'")
+
+    query_vector = _embed_query(query)
+    if query_vector is not None:
+        cached = _semantic_cache_lookup(query_vector)
+        if cached is not None:
+            print("✅ Served from semantic response cache")
+            yield cached["response"]
+            yield {"done": True, "provider_used": cached["provider_used"],
+                   "sources": cached["sources"], "success": True, "error": None}
+            return
+
+    articles = get_relevant_articles(query, query_vector=query_vector)
+    context = create_context_from_articles(articles)
+
+    sources = [{
+        "title": article.get("title", "Untitled"),
+        "url": article.get("resourceUrl", ""),
+        "category": article.get("category", "General")
+    } for article in articles]
+
+    if not articles:
+        yield {"done": True, "provider_used": None, "sources": [], "success": False,
+               "error": "No relevant information found in our trusted sources database."}
+        return
+
+    errors = []
+    for label, name, stream_fn in _STREAM_PROVIDERS:
+        if not _breaker_allows(name):
+            errors.append(f"{name}: Circuit open")
+            continue
+        pieces = []
+        try:
+            for chunk in stream_fn(query, context):
+                pieces.append(chunk)
+                yield chunk
+        except Exception as e:
+            _breaker_record(name, False)
+            errors.append(f"{name}: {e}")
+            if pieces:
+                # The stream died mid-answer and the partial text is already
+                # with the client, so report the failure instead of starting
+                # over with the next provider
+                yield {"done": True, "provider_used": label, "sources": sources,
+                       "success": False, "error": f"Stream interrupted: {e}"}
+                return
+            continue
+        _breaker_record(name, True)
+        if query_vector is not None:
+            _semantic_cache_store(query_vector, {
+                "response": "".join(pieces),
+                "provider_used": label,
+                "sources": sources
+            })
+        yield {"done": True, "provider_used": label, "sources": sources,
+               "success": True, "error": None}
+        return
+
+    error = "All AI providers failed to generate a response."
+    for provider_error in errors:
+        error += f" {provider_error}"
+    yield {"done": True, "provider_used": None, "sources": sources,
+           "success": False, "error": error}
+
 if __name__ == "__main__":
     # Test the integration with a sample query
     test_query = "What foods should I avoid with kidney disease?"
@@ -1,11 +1,46 @@
 import os
 import datetime
-from typing import List, Dict, Any
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple
+
+# orjson parses and serializes JSON several times faster than the stdlib
+# module; fall back silently when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _json_loads(payload):
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+def _json_dumps(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
 from supabase import create_client, Client
 import openai
 import google.generativeai as genai
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+# lxml parses HTML several times faster than the stdlib parser; fall back
+# silently when it isn't installed
+try:
+    import lxml  # noqa: F401
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
+
+# Only paragraph tags are ever read from scraped pages, so skip building
+# the rest of the document tree entirely
+_PARAGRAPH_STRAINER = SoupStrainer("p")
+
+# Enough text for a patient-facing summary; no point extracting more
+_MAX_ARTICLE_CHARS = 10_000
 
 # Load environment variables from Replit Secrets
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -14,20 +49,36 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
 
-# Set up Supabase and AI clients
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Set up AI clients
 # the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
 openai_client = openai.OpenAI(api_key=OPENAI_API_KEY)
 genai.configure(api_key=GEMINI_API_KEY)
 
+# The Supabase client is created on first use and reused for every insert,
+# so one PostgREST HTTP client keeps its keep-alive connections across the
+# whole upload run and importing the module needs no Supabase credentials
+@lru_cache(maxsize=1)
+def get_supabase() -> Client:
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+# Shared HTTP session so the Perplexity calls and article fetches reuse
+# keep-alive connections instead of paying a TCP+TLS handshake per request
+_http_session = requests.Session()
+
+# Prompts shared by every summarizer, built once at import. A byte-stable
+# system prompt also lets provider-side prompt-prefix caching apply across
+# requests.
+_MEDICAL_WRITER_SYSTEM_PROMPT = "You are a skilled medical writer who specializes in making complex health information accessible to patients."
+_SUMMARY_PROMPT_TEMPLATE = "Summarize this for a kidney disease patient in plain language:\n{text}"
+
 # Function to summarize with OpenAI (updated for 2024 API)
 def summarize_with_openai(text: str) -> str:
     try:
         response = openai_client.chat.completions.create(
             model="gpt-4o",
             messages=[
-                {"role": "system", "content": "You are a skilled medical writer who specializes in making complex health information accessible to patients."},
-                {"role": "user", "content": f"Summarize this for a kidney disease patient in plain language:\n{text}"}
+                {"role": "system", "content": _MEDICAL_WRITER_SYSTEM_PROMPT},
+                {"role": "user", "content": _SUMMARY_PROMPT_TEMPLATE.format(text=text)}
             ],
             max_tokens=800,
             temperature=0.7
@@ -43,7 +94,7 @@ def summarize_with_gemini(text: str) -> str:
         # Using the latest Gemini model
         model = genai.GenerativeModel('gemini-1.5-pro')
         response = model.generate_content(
-            f"Summarize this for a kidney disease patient in plain language:\n{text}",
+            _SUMMARY_PROMPT_TEMPLATE.format(text=text),
             generation_config={"max_output_tokens": 800}
         )
         return response.text.strip()
@@ -54,29 +105,29 @@ def summarize_with_gemini(text: str) -> str:
 # Function to summarize with Perplexity (as fallback)
 def summarize_with_perplexity(text: str) -> str:
     try:
-        response = requests.post(
+        response = _http_session.post(
             "https://api.perplexity.ai/chat/completions",
             headers={
                 "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
                 "Content-Type": "application/json"
             },
-            json={
+            data=_json_dumps({
                 "model": "llama-3.1-sonar-small-128k-online",
                 "messages": [
                     {
                         "role": "system",
-                        "content": "You are a skilled medical writer who specializes in making complex health information accessible to patients."
+                        "content": _MEDICAL_WRITER_SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
-                        "content": f"Summarize this for a kidney disease patient in plain language:\n{text}"
+                        "content": _SUMMARY_PROMPT_TEMPLATE.format(text=text)
                     }
                 ],
                 "temperature": 0.2,
                 "max_tokens": 800
-            }
+            })
         )
-        response_data = response.json()
+        response_data = _json_loads(response.content)
         return response_data["choices"][0]["message"]["content"].strip()
     except Exception as e:
         print(f"Perplexity error: {e}")
@@ -85,17 +136,32 @@ def summarize_with_perplexity(text: str) -> str:
 # Function to fetch and clean article content
 def fetch_article_text(url: str) -> str:
     try:
-        response = requests.get(url, headers={
+        response = _http_session.get(url, headers={
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         })
-        soup = BeautifulSoup(response.text, 'html.parser')
-        paragraphs = soup.find_all('p')
-        return '\n'.join(p.get_text() for p in paragraphs if len(p.get_text()) > 60)
+        response.raise_for_status()
+        # Parse the raw bytes so Requests' charset sniffing is skipped;
+        # the parser handles encoding detection itself
+        soup = BeautifulSoup(response.content, _HTML_PARSER, parse_only=_PARAGRAPH_STRAINER)
+        # get_text walks the whole paragraph subtree, so extract each one
+        # exactly once and stop as soon as enough text has accumulated
+        chunks = []
+        total = 0
+        for p in soup.find_all('p'):
+            text = p.get_text(strip=True)
+            if len(text) > 60:
+                chunks.append(text)
+                total += len(text)
+                if total >= _MAX_ARTICLE_CHARS:
+                    break
+        return '\n'.join(chunks)
     except Exception as e:
         print(f"Error fetching {url}: {e}")
         return ""
 
-# Transplant-related articles from trusted sources
+# Transplant-related articles from trusted sources. Entries with a
+# "content_url" key have their text scraped by build_articles(); the rest
+# carry inline content.
 articles_to_upload = [
     {
         "title": "Understanding Dialysis",
@@ -119,7 +185,7 @@ articles_to_upload = [
         "source": "National Kidney Foundation",
         "category": "Transplant",
         "tags": ["transplant", "living donor"],
-        "content": fetch_article_text("https://www.kidney.org/transplantation/livingdonors")
+        "content_url": "https://www.kidney.org/transplantation/livingdonors"
     },
     {
         "title": "OPTN: How to Get on the Transplant Waitlist",
@@ -127,7 +193,7 @@ articles_to_upload = [
         "source": "OPTN",
         "category": "Transplant",
         "tags": ["transplant", "waitlist", "eligibility"],
-        "content": fetch_article_text("https://optn.transplant.hrsa.gov/learn/about-transplantation/waiting-list/")
+        "content_url": "https://optn.transplant.hrsa.gov/learn/about-transplantation/waiting-list/"
     },
     {
         "title": "UNOS Transplant Basics",
@@ -135,36 +201,63 @@ articles_to_upload = [
         "source": "UNOS",
         "category": "Transplant",
         "tags": ["UNOS", "transplant basics"],
-        "content": fetch_article_text("https://unos.org/transplant/")
+        "content_url": "https://unos.org/transplant/"
     }
 ]
 
+# Resolve "content_url" entries by scraping all remote articles concurrently
+def build_articles(specs: List[Dict[str, Any]] = articles_to_upload) -> List[Dict[str, Any]]:
+    urls = [spec["content_url"] for spec in specs if "content_url" in spec]
+    fetched: Dict[str, str] = {}
+    if urls:
+        with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+            fetched = dict(zip(urls, executor.map(fetch_article_text, urls)))
+
+    articles = []
+    for spec in specs:
+        article = {key: value for key, value in spec.items() if key != "content_url"}
+        if "content_url" in spec:
+            article["content"] = fetched[spec["content_url"]]
+        articles.append(article)
+    return articles
+
+# Summarize one article through the OpenAI -> Gemini -> Perplexity fallback chain
+def _summarize_article(article: Dict[str, Any]) -> Tuple[str, str]:
+    summary = "No summary available."
+    model_used = "none"
+    try:
+        summary = summarize_with_openai(article["content"])
+        model_used = "openai"
+    except Exception as e:
+        print(f"OpenAI summarization failed: {e}, trying Gemini...")
+        try:
+            summary = summarize_with_gemini(article["content"])
+            model_used = "gemini"
+        except Exception as e2:
+            print(f"Gemini summarization failed: {e2}, trying Perplexity...")
+            try:
+                summary = summarize_with_perplexity(article["content"])
+                model_used = "perplexity"
+            except Exception as e3:
+                print(f"All summarization methods failed: {e3}")
+                model_used = "none"
+    return summary, model_used
+
 # Upload summarized articles to Supabase
 def store_articles(articles: List[Dict[str, Any]]):
-    for article in articles:
+    # Summaries are independent LLM calls, so run them concurrently instead
+    # of paying the summed provider latencies one article at a time. The
+    # worker cap doubles as a crude rate limit on provider QPM.
+    with ThreadPoolExecutor(max_workers=min(8, max(1, len(articles)))) as executor:
+        summaries = list(executor.map(_summarize_article, articles))
+
+    entries = []
+    for article, (summary, model_used) in zip(articles, summaries):
         print(f"Processing: {article['title']}...")
-        
-        # Try OpenAI first
-        summary = "No summary available."
-        try:
-            summary = summarize_with_openai(article["content"])
-            model_used = "openai"
-        except Exception as e:
-            print(f"OpenAI summarization failed: {e}, trying Gemini...")
-            try:
-                summary = summarize_with_gemini(article["content"])
-                model_used = "gemini"
-            except Exception as e2:
-                print(f"Gemini summarization failed: {e2}, trying Perplexity...")
-                try:
-                    summary = summarize_with_perplexity(article["content"])
-                    model_used = "perplexity"
-                except Exception as e3:
-                    print(f"All summarization methods failed: {e3}")
-                    model_used = "none"
-        
+
         if summary != "No summary available.":
-            entry = {
+            print(f"Summary generated using {model_used}.")
+            entries.append({
                 "title": article["title"],
                 "summary": summary,
                 "url": article["url"],
@@ -173,17 +266,23 @@ def store_articles(articles: List[Dict[str, Any]]):
                 "category": article["category"],
                 "user_focus_tags": article["tags"],
                 "model_used": model_used
-            }
-            
-            print(f"Summary generated using {model_used}. Storing in Supabase...")
-            try:
-                supabase.table("education_articles").insert(entry).execute()
-                print(f"✅ Stored: {article['title']}")
-            except Exception as e:
-                print(f"❌ Failed to store in Supabase: {e}")
+            })
         else:
             print(f"❌ Could not generate summary for: {article['title']}")
 
+    if not entries:
+        return
+
+    # PostgREST accepts an array body, so all rows go up in one HTTPS
+    # round-trip instead of one insert per article
+    print(f"Storing {len(entries)} articles in Supabase...")
+    try:
+        get_supabase().table("education_articles").insert(entries).execute()
+        for entry in entries:
+            print(f"✅ Stored: {entry['title']}")
+    except Exception as e:
+        print(f"❌ Failed to store in Supabase: {e}")
+
 # Reusable chat log function for journaling/chatbot
 def log_chat_to_supabase(user_id: str, user_input: str, ai_response: str, model_used: str = "openai", tags: list = None, emotional_score: int = None):
     data = {
@@ -201,7 +300,7 @@ def log_chat_to_supabase(user_id: str, user_input: str, ai_response: str, model_
         data["emotional_score"] = emotional_score
 
     try:
-        response = supabase.table("chat_logs").insert(data).execute()
+        response = get_supabase().table("chat_logs").insert(data).execute()
         print(f"✅ Logged chat to Supabase: {user_input[:30]}...")
         return response
     except Exception as e:
@@ -245,7 +344,7 @@ def log_health_scores(user_id: str, pain: int, stress: int, fatigue: int, notes:
     suggestion = generate_health_suggestion(pain, stress, fatigue)
 
     try:
-        response = supabase.table("health_logs").insert({
+        response = get_supabase().table("health_logs").insert({
             "user_id": user_id,
             "pain_score": pain,
             "stress_score": stress,
@@ -297,5 +396,5 @@ def calculate_egfr(age: int, gender: str, serum_creatinine: float) -> float:
 
 if __name__ == "__main__":
     print("🔁 Uploading transplant and education summaries...")
-    store_articles(articles_to_upload)
+    store_articles(build_articles())
     print("✅ Upload complete.")
\ No newline at end of file
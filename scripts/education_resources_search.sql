@@ -0,0 +1,30 @@
+-- Full-text search support for education_resources
+-- Moves article retrieval from "select every row + Python keyword scoring"
+-- to a single GIN-indexed Postgres query that ranks and limits server-side.
+
+-- Weighted search document: title matches count most, then summary, then body
+ALTER TABLE public.education_resources
+    ADD COLUMN IF NOT EXISTS tsv tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_education_resources_tsv
+    ON public.education_resources USING GIN (tsv);
+
+-- Search function called from the Python integration layer via supabase.rpc
+CREATE OR REPLACE FUNCTION search_education_resources(
+    search_query TEXT,
+    max_results INTEGER DEFAULT 5
+)
+RETURNS SETOF education_resources
+LANGUAGE sql STABLE
+AS $$
+    SELECT er.*
+    FROM public.education_resources er
+    WHERE er.tsv @@ plainto_tsquery('english', search_query)
+    ORDER BY ts_rank_cd(er.tsv, plainto_tsquery('english', search_query)) DESC
+    LIMIT max_results;
+$$;
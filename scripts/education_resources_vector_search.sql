@@ -0,0 +1,31 @@
+-- Vector similarity search for education_resources
+-- Complements the tsvector path in education_resources_search.sql: the
+-- query embedding the Python layer already computes for its caches is
+-- matched against stored article embeddings, so paraphrases that share no
+-- keywords still retrieve the right articles.
+
+CREATE EXTENSION IF NOT EXISTS vector;
+
+-- text-embedding-3-small vectors; rows are backfilled by the uploader
+ALTER TABLE public.education_resources
+    ADD COLUMN IF NOT EXISTS embedding vector(1536);
+
+CREATE INDEX IF NOT EXISTS idx_education_resources_embedding
+    ON public.education_resources
+    USING ivfflat (embedding vector_cosine_ops)
+    WITH (lists = 100);
+
+-- kNN search called from the Python integration layer via supabase.rpc
+CREATE OR REPLACE FUNCTION match_education_resources(
+    query_embedding vector(1536),
+    match_count INTEGER DEFAULT 5
+)
+RETURNS SETOF education_resources
+LANGUAGE sql STABLE
+AS $$
+    SELECT er.*
+    FROM public.education_resources er
+    WHERE er.embedding IS NOT NULL
+    ORDER BY er.embedding <=> query_embedding
+    LIMIT match_count;
+$$;
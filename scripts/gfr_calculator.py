@@ -1,12 +1,49 @@
 import os
 import datetime
+from functools import lru_cache
 from typing import List, Optional
 from supabase import create_client, Client
 import openai
 import google.generativeai as genai
 import requests
 import json
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+# lxml parses HTML several times faster than the stdlib parser; fall back
+# silently when it isn't installed
+try:
+    import lxml  # noqa: F401
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
+
+# Only paragraph tags are ever read from scraped pages
+_PARAGRAPH_STRAINER = SoupStrainer("p")
+
+# Enough text for a patient-facing summary; no point extracting more
+_MAX_ARTICLE_CHARS = 10_000
+
+# orjson parses and serializes several times faster than the stdlib json
+# module; fall back silently when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _write_json_file(path: str, data) -> None:
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data))
+    else:
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+def _read_json_file(path: str):
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path, "r") as f:
+        return json.load(f)
 
 # Load environment variables from Replit Secrets
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -14,11 +51,17 @@ SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-# Set up Supabase, OpenAI, and Gemini clients
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Set up OpenAI and Gemini clients
 openai.api_key = OPENAI_API_KEY
 genai.configure(api_key=GEMINI_API_KEY)
 
+# The Supabase client is created on first use and reused afterwards, so
+# importing this module (e.g. just for calculate_egfr) doesn't require
+# Supabase credentials or pay the client's connection setup
+@lru_cache(maxsize=1)
+def get_supabase() -> Client:
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
 # Function to summarize with OpenAI
 def summarize_with_openai(text: str) -> str:
     response = openai.ChatCompletion.create(
@@ -44,9 +87,20 @@ def summarize_with_gemini(text: str) -> str:
 def fetch_article_text(url: str) -> str:
     try:
         response = requests.get(url)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        paragraphs = soup.find_all('p')
-        return '\n'.join(p.get_text() for p in paragraphs if len(p.get_text()) > 60)
+        response.raise_for_status()
+        soup = BeautifulSoup(response.content, _HTML_PARSER, parse_only=_PARAGRAPH_STRAINER)
+        # get_text walks the whole paragraph subtree, so extract each one
+        # exactly once and stop as soon as enough text has accumulated
+        chunks = []
+        total = 0
+        for p in soup.find_all('p'):
+            text = p.get_text(strip=True)
+            if len(text) > 60:
+                chunks.append(text)
+                total += len(text)
+                if total >= _MAX_ARTICLE_CHARS:
+                    break
+        return '\n'.join(chunks)
     except Exception as e:
         print(f"Error fetching {url}: {e}")
         return ""
@@ -87,7 +141,7 @@ def store_articles(articles: List[dict]):
             "user_focus_tags": article["tags"]
         }
         print("🔍 FULL RESPONSE:\n", openai_summary)
-        supabase.table("education_articles").insert(entry).execute()
+        get_supabase().table("education_articles").insert(entry).execute()
 
 # Improved GFR calculator with better gender handling
 def calculate_egfr(age: Optional[int], gender: Optional[str], serum_creatinine: Optional[float]) -> Optional[float]:
@@ -162,14 +216,13 @@ def calculate_egfr(age: Optional[int], gender: Optional[str], serum_creatinine:
 # Function to fetch and refresh user profile data with improved error handling
 def fetch_user_profile(user_id: str):
     try:
-        response = supabase.table("user_profiles").select("*").eq("user_id", user_id).execute()
+        response = get_supabase().table("user_profiles").select("*").eq("user_id", user_id).execute()
         data = response.get("data", [])
         
         if data and len(data) > 0:
             user_data = data[0]
             # Cache the user profile for offline use
-            with open("user_cache.json", "w") as f:
-                json.dump(user_data, f)
+            _write_json_file("user_cache.json", user_data)
             
             # Debug the gender field
             if "gender" in user_data:
@@ -182,8 +235,7 @@ def fetch_user_profile(user_id: str):
             print(f"❌ User profile not found for ID: {user_id}")
             # Try to load from cache if available
             try:
-                with open("user_cache.json", "r") as f:
-                    cached_data = json.load(f)
+                cached_data = _read_json_file("user_cache.json")
                 print("📁 Using cached user profile data")
                 return cached_data
             except Exception as cache_error:
@@ -1,12 +1,30 @@
 import os
 import datetime
-from typing import List, Dict, Any, Optional
+import functools
+import hashlib
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Optional, Tuple
 from supabase import create_client, Client
 import openai
-import google.generativeai as genai
 import requests
 from bs4 import BeautifulSoup
 
+# orjson parses the multi-KB JSON payloads LLMs return several times faster
+# than the stdlib json module; fall back silently when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _json_loads(payload):
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
 # Load environment variables from Replit Secrets
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
@@ -18,43 +36,107 @@ PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY) if SUPABASE_URL and SUPABASE_KEY else None
 if OPENAI_API_KEY:
     openai.api_key = OPENAI_API_KEY
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+
+# google.generativeai drags in a large protobuf/grpc dependency tree, so it
+# is imported lazily on first Gemini use instead of at module import time
+@functools.lru_cache(maxsize=1)
+def _get_genai():
+    import google.generativeai as genai
+    if GEMINI_API_KEY:
+        genai.configure(api_key=GEMINI_API_KEY)
+    return genai
+
+# Shared HTTP session so outbound calls (Perplexity, article fetches) reuse
+# keep-alive connections instead of paying a TCP+TLS handshake per request
+_http_session = requests.Session()
+
+# Prompts built once at import. Keeping these byte-identical across calls
+# also lets providers that cache prompt prefixes take effect.
+SUMMARY_INSTRUCTION = "Summarize this for a kidney disease patient in plain language:"
+PERPLEXITY_SUMMARY_SYSTEM_PROMPT = "You summarize medical content for kidney disease patients in plain language."
+BATCH_SUMMARY_SYSTEM_PROMPT = (
+    "You summarize medical content for kidney disease patients in plain language. "
+    "Return a JSON object {\"summaries\": [...]} with one summary per input text, in order."
+)
+
+# Structured-output schema for the batch summary call. Constraining the
+# response shape server-side guarantees the JSON parse succeeds on the first
+# try instead of relying on the model honoring the prompt.
+_BATCH_SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summaries": {
+            "type": "array",
+            "items": {"type": "string"}
+        }
+    },
+    "required": ["summaries"],
+    "additionalProperties": False
+}
+
+# In-process cache of generated summaries keyed by a hash of the input text.
+# Re-runs of the uploader and duplicated source content hit the cache instead
+# of paying another LLM round-trip. Bounded so long runs can't grow it forever.
+_SUMMARY_CACHE: Dict[str, str] = {}
+_SUMMARY_CACHE_MAX = 1024
+
+def _summary_cache_key(provider: str, text: str) -> str:
+    return f"{provider}:{hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()}"
+
+def _remember_summary(key: str, summary: str):
+    if summary:
+        if len(_SUMMARY_CACHE) >= _SUMMARY_CACHE_MAX:
+            # Drop the oldest entry (insertion order) to stay bounded
+            _SUMMARY_CACHE.pop(next(iter(_SUMMARY_CACHE)))
+        _SUMMARY_CACHE[key] = summary
 
 # Function to summarize with OpenAI
 def summarize_with_openai(text: str) -> str:
+    cache_key = _summary_cache_key("openai", text)
+    if cache_key in _SUMMARY_CACHE:
+        return _SUMMARY_CACHE[cache_key]
     try:
         # the newest OpenAI model is "gpt-4o" which was released May 13, 2024
         response = openai.chat.completions.create(
             model="gpt-4o",
             messages=[
-                {"role": "user", "content": f"Summarize this for a kidney disease patient in plain language:\n{text}"}
+                {"role": "user", "content": f"{SUMMARY_INSTRUCTION}\n{text}"}
             ],
             max_tokens=800,
             temperature=0.7
         )
-        return response.choices[0].message.content
+        summary = response.choices[0].message.content
+        _remember_summary(cache_key, summary)
+        return summary
     except Exception as e:
         print(f"OpenAI summarization error: {e}")
         return ""
 
 # Function to summarize with Gemini
 def summarize_with_gemini(text: str) -> str:
+    cache_key = _summary_cache_key("gemini", text)
+    if cache_key in _SUMMARY_CACHE:
+        return _SUMMARY_CACHE[cache_key]
     try:
-        model = genai.GenerativeModel('gemini-1.5-pro')
+        model = _get_genai().GenerativeModel('gemini-1.5-pro')
         response = model.generate_content(
-            f"Summarize this for a kidney disease patient in plain language:\n{text}",
+            f"{SUMMARY_INSTRUCTION}\n{text}",
             generation_config={"max_output_tokens": 800}
         )
-        return response.text.strip()
+        summary = response.text.strip()
+        _remember_summary(cache_key, summary)
+        return summary
     except Exception as e:
         print(f"Gemini summarization error: {e}")
         return ""
 
 # Function to summarize with Perplexity
 def summarize_with_perplexity(text: str) -> str:
+    cache_key = _summary_cache_key("perplexity", text)
+    if cache_key in _SUMMARY_CACHE:
+        return _SUMMARY_CACHE[cache_key]
     try:
-        response = requests.post(
+        response = _http_session.post(
             "https://api.perplexity.ai/chat/completions",
             headers={
                 "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
@@ -65,11 +147,11 @@ def summarize_with_perplexity(text: str) -> str:
                 "messages": [
                     {
                         "role": "system",
-                        "content": "You summarize medical content for kidney disease patients in plain language."
+                        "content": PERPLEXITY_SUMMARY_SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
-                        "content": f"Summarize this for a kidney disease patient in plain language:\n{text}"
+                        "content": f"{SUMMARY_INSTRUCTION}\n{text}"
                     }
                 ],
                 "temperature": 0.2,
@@ -77,15 +159,105 @@ def summarize_with_perplexity(text: str) -> str:
             }
         )
         response_data = response.json()
-        return response_data['choices'][0]['message']['content']
+        summary = response_data['choices'][0]['message']['content']
+        _remember_summary(cache_key, summary)
+        return summary
     except Exception as e:
         print(f"Perplexity summarization error: {e}")
         return ""
 
+# Summarize several texts in a single OpenAI call (micro-batching).
+# One multiplexed request amortizes the per-call overhead (TLS, HTTP,
+# prompt priming) across the whole batch instead of paying it per text.
+def summarize_batch_with_openai(texts: List[str]) -> List[str]:
+    if not texts:
+        return []
+
+    numbered = "\n\n".join(f"Text {i + 1}:\n{text}" for i, text in enumerate(texts))
+    response = openai.chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": BATCH_SUMMARY_SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": f"Summarize each of the following {len(texts)} texts for a kidney disease patient in plain language:\n\n{numbered}"
+            }
+        ],
+        response_format={
+            "type": "json_schema",
+            "json_schema": {
+                "name": "batch_summaries",
+                "schema": _BATCH_SUMMARY_SCHEMA,
+                "strict": True
+            }
+        },
+        max_tokens=800 * len(texts),
+        temperature=0.7
+    )
+    payload = _json_loads(response.choices[0].message.content)
+    summaries = payload.get("summaries", [])
+    if len(summaries) != len(texts):
+        raise ValueError(f"Expected {len(texts)} summaries, got {len(summaries)}")
+    return [str(summary).strip() for summary in summaries]
+
+# Summarize texts through the OpenAI Batch API. Batch jobs cost half as much
+# as synchronous calls and are made for exactly this kind of non-interactive
+# bulk work (content uploads, nightly reprocessing), at the price of a
+# polling wait. Interactive paths should keep using the synchronous helpers.
+def summarize_with_openai_batch_api(texts: List[str], poll_seconds: int = 30, timeout_seconds: int = 3600) -> List[str]:
+    if not texts:
+        return []
+
+    lines = []
+    for i, text in enumerate(texts):
+        lines.append(json.dumps({
+            "custom_id": f"summary-{i}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": "gpt-4o",
+                "messages": [
+                    {"role": "user", "content": f"{SUMMARY_INSTRUCTION}\n{text}"}
+                ],
+                "max_tokens": 800,
+                "temperature": 0.7
+            }
+        }))
+
+    batch_file = openai.files.create(
+        file=("summaries.jsonl", "\n".join(lines).encode("utf-8")),
+        purpose="batch"
+    )
+    batch = openai.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+
+    deadline = time.monotonic() + timeout_seconds
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Batch {batch.id} still '{batch.status}' after {timeout_seconds}s")
+        time.sleep(poll_seconds)
+        batch = openai.batches.retrieve(batch.id)
+
+    if batch.status != "completed":
+        raise RuntimeError(f"Batch {batch.id} finished with status '{batch.status}'")
+
+    summaries = [""] * len(texts)
+    output = openai.files.content(batch.output_file_id)
+    for line in output.text.splitlines():
+        if not line.strip():
+            continue
+        record = _json_loads(line)
+        index = int(record["custom_id"].rsplit("-", 1)[1])
+        summaries[index] = record["response"]["body"]["choices"][0]["message"]["content"].strip()
+    return summaries
+
 # Function to fetch and clean article content
 def fetch_article_text(url: str) -> str:
     try:
-        response = requests.get(url)
+        response = _http_session.get(url)
         soup = BeautifulSoup(response.text, 'html.parser')
         paragraphs = soup.find_all('p')
         return '\n'.join(p.get_text() for p in paragraphs if len(p.get_text()) > 60)
@@ -93,46 +265,192 @@ def fetch_article_text(url: str) -> str:
         print(f"Error fetching {url}: {e}")
         return ""
 
-# Store articles
-def store_articles(articles: List[Dict[str, Any]]):
-    for article in articles:
-        print(f"Summarizing: {article['title']}...")
-        
-        # Try different AI providers with fallback
-        summary = ""
-        try:
-            summary = summarize_with_openai(article["content"])
-        except Exception as e:
-            print(f"OpenAI error, trying Gemini: {e}")
-            try:
-                summary = summarize_with_gemini(article["content"])
-            except Exception as e:
-                print(f"Gemini error, trying Perplexity: {e}")
+# Single provider-fallback chain shared by every caller that needs a summary.
+# Each summarize_with_* helper already catches its own errors and returns an
+# empty string, so the chain just walks providers until one produces output.
+_SUMMARIZERS = (
+    ("OpenAI", summarize_with_openai),
+    ("Gemini", summarize_with_gemini),
+    ("Perplexity", summarize_with_perplexity),
+)
+
+# When a lower-priority provider finishes first, wait this long for a
+# higher-priority one (listed earlier in _SUMMARIZERS) before accepting
+# the faster answer. Balances latency against preferring OpenAI's output.
+_PREFERRED_GRACE_SECONDS = 0.25
+
+# Per-provider circuit breaker: after enough consecutive failures a provider
+# is skipped for a cooldown window, so a provider that is down (rate-limited,
+# outage) costs nothing instead of a full timeout on every request.
+_BREAKER_TRIP_FAILURES = 3
+_BREAKER_COOLDOWN_SECONDS = 30.0
+_breaker_lock = threading.Lock()
+_breaker_state: Dict[str, Dict[str, float]] = {}
+
+def _breaker_allows(name: str) -> bool:
+    with _breaker_lock:
+        state = _breaker_state.get(name)
+        return state is None or time.monotonic() >= state["open_until"]
+
+def _breaker_record(name: str, success: bool):
+    with _breaker_lock:
+        state = _breaker_state.setdefault(name, {"fails": 0, "open_until": 0.0})
+        if success:
+            state["fails"] = 0
+            state["open_until"] = 0.0
+        else:
+            state["fails"] += 1
+            if state["fails"] >= _BREAKER_TRIP_FAILURES:
+                state["open_until"] = time.monotonic() + _BREAKER_COOLDOWN_SECONDS
+                print(f"⚠️ {name} circuit opened for {_BREAKER_COOLDOWN_SECONDS:.0f}s after {state['fails']} consecutive failures")
+
+def _summarize_with_fallback(text: str) -> str:
+    # The providers are pure network I/O, so they are raced concurrently
+    # instead of tried one after another: wall clock becomes the fastest
+    # provider's latency rather than the sum of the failed attempts.
+    priority = {name: rank for rank, (name, _) in enumerate(_SUMMARIZERS)}
+    candidates = [(name, fn) for name, fn in _SUMMARIZERS if _breaker_allows(name)]
+    if not candidates:
+        # Every circuit is open; try them all rather than fail outright
+        candidates = list(_SUMMARIZERS)
+    executor = ThreadPoolExecutor(max_workers=len(candidates))
+    try:
+        futures = {executor.submit(fn, text): name for name, fn in candidates}
+        pending = set(futures)
+        best_rank = len(_SUMMARIZERS)
+        best_summary = ""
+        deadline = None
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                break  # grace window expired; keep the best answer so far
+            for future in done:
+                name = futures[future]
                 try:
-                    summary = summarize_with_perplexity(article["content"])
+                    summary = future.result()
                 except Exception as e:
-                    print(f"All summarization methods failed: {e}")
-                    summary = "Summary generation failed. Please try again later."
-        
+                    print(f"{name} summarization failed: {e}")
+                    _breaker_record(name, False)
+                    continue
+                _breaker_record(name, bool(summary))
+                if summary and priority[name] < best_rank:
+                    best_rank = priority[name]
+                    best_summary = summary
+                    deadline = time.monotonic() + _PREFERRED_GRACE_SECONDS
+            if best_summary:
+                # Stop early once no pending provider outranks the winner
+                if not any(priority[futures[f]] < best_rank for f in pending):
+                    break
+    finally:
+        # Abandon stragglers instead of blocking on them; a context manager
+        # here would wait for every racer and make wall clock the slowest
+        # provider's latency instead of the winner's
+        executor.shutdown(wait=False, cancel_futures=True)
+    if best_summary:
+        return best_summary
+    print("All summarization methods failed.")
+    return ""
+
+# Store articles. use_batch_api routes the summarization through the OpenAI
+# Batch API (half price, polling turnaround) for non-interactive runs.
+def store_articles(articles: List[Dict[str, Any]], use_batch_api: bool = False):
+    # Summarize the whole batch with one OpenAI call; fall back to the
+    # per-article provider chain for anything the batch call couldn't cover.
+    batch_summaries: List[str] = []
+    try:
+        contents = [a["content"] for a in articles]
+        if use_batch_api:
+            batch_summaries = summarize_with_openai_batch_api(contents)
+        else:
+            batch_summaries = summarize_batch_with_openai(contents)
+    except Exception as e:
+        print(f"Batch summarization failed, falling back to per-article calls: {e}")
+
+    for index, article in enumerate(articles):
+        print(f"Summarizing: {article['title']}...")
+
+        summary = batch_summaries[index] if index < len(batch_summaries) else ""
+        if not summary:
+            summary = _summarize_with_fallback(article["content"])
         if not summary:
             print(f"Failed to generate summary for: {article['title']}")
             continue
-            
-        entry = {
-            "title": article["title"],
-            "summary": summary,
-            "url": article["url"],
-            "source": article["source"],
-            "published_date": datetime.date.today().isoformat(),
-            "category": article["category"],
-            "user_focus_tags": article["tags"]
-        }
-        
-        print(f"📝 Storing summary for: {article['title']}")
+
+        _store_article_summary(article, summary)
+
+    # Make sure the queued article rows reach Supabase before returning
+    flush_pending_writes()
+
+# Build the Supabase row for a summarized article and queue it for insert.
+# The background writer collapses the per-article rows into bulk inserts.
+def _store_article_summary(article: Dict[str, Any], summary: str):
+    entry = {
+        "title": article["title"],
+        "summary": summary,
+        "url": article["url"],
+        "source": article["source"],
+        "published_date": datetime.date.today().isoformat(),
+        "category": article["category"],
+        "user_focus_tags": article["tags"]
+    }
+
+    print(f"📝 Queued summary for: {article['title']}")
+    _enqueue_write("education_articles", entry)
+
+# Background Supabase writer. Log rows are enqueued and flushed by a daemon
+# thread, so callers never block on a Supabase round-trip, and bursts of rows
+# for the same table collapse into a single bulk insert.
+_WRITE_QUEUE: "queue.Queue[Tuple[str, Dict[str, Any]]]" = queue.Queue()
+_WRITE_BATCH_MAX = 50
+_WRITE_FLUSH_SECONDS = 0.2
+_writer_started = False
+_writer_lock = threading.Lock()
+
+def _supabase_writer():
+    while True:
+        table, row = _WRITE_QUEUE.get()
+        rows = [row]
+        consumed = 1
+        deadline = time.monotonic() + _WRITE_FLUSH_SECONDS
+        while len(rows) < _WRITE_BATCH_MAX:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                next_table, next_row = _WRITE_QUEUE.get(timeout=remaining)
+            except queue.Empty:
+                break
+            consumed += 1
+            if next_table != table:
+                # Different table: flush what we have and requeue this row
+                _WRITE_QUEUE.put((next_table, next_row))
+                break
+            rows.append(next_row)
+
         try:
-            supabase.table("education_articles").insert(entry).execute()
+            supabase.table(table).insert(rows).execute()
+            print(f"✅ Flushed {len(rows)} row(s) to {table}")
         except Exception as e:
-            print(f"Error storing article: {e}")
+            print(f"❌ Error writing batch to {table}: {e}")
+        finally:
+            for _ in range(consumed):
+                _WRITE_QUEUE.task_done()
+
+def _enqueue_write(table: str, row: Dict[str, Any]):
+    global _writer_started
+    if not _writer_started:
+        with _writer_lock:
+            if not _writer_started:
+                threading.Thread(target=_supabase_writer, daemon=True).start()
+                _writer_started = True
+    _WRITE_QUEUE.put((table, row))
+
+# Block until every queued write has been flushed. Batch jobs call this
+# before exiting so the daemon writer isn't killed with rows still queued.
+def flush_pending_writes():
+    if _writer_started:
+        _WRITE_QUEUE.join()
 
 # Log chat to Supabase
 def log_chat_to_supabase(user_id: str, user_input: str, ai_response: str, model_used: str = "openai", tags: Optional[List[str]] = None, emotional_score: Optional[int] = None):
@@ -152,16 +470,75 @@ def log_chat_to_supabase(user_id: str, user_input: str, ai_response: str, model_
     if emotional_score is not None:
         data["emotional_score"] = emotional_score
 
+    # Queued write: the background writer batches and inserts off the
+    # response path, so there is no per-call Supabase round-trip here.
+    _enqueue_write("chat_logs", data)
+    print(f"📨 Queued chat log for Supabase: {user_input[:30]}...")
+    return None
+
+# Provider-specific helpers for health suggestions (run concurrently below)
+def _health_suggestion_with_openai(prompt: str) -> str:
+    response = openai.chat.completions.create(
+        model="gpt-4o",
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=150
+    )
+    return response.choices[0].message.content.strip()
+
+def _health_suggestion_with_gemini(prompt: str) -> str:
+    model = _get_genai().GenerativeModel('gemini-1.5-pro')
+    response = model.generate_content(prompt)
+    return response.text.strip()
+
+# Suggestions for an identical (pain, stress, fatigue) triple are reused for
+# an hour instead of paying another LLM round-trip. The input domain is tiny
+# (0-10 per score), so the cache stays small without explicit bounding.
+_SUGGESTION_CACHE: Dict[Tuple[int, int, int], Tuple[float, str]] = {}
+_SUGGESTION_TTL_SECONDS = 3600
+
+# Single-flight map: concurrent callers with the same key wait on the one
+# call already in flight instead of each launching their own provider work.
+_INFLIGHT: Dict[Any, Tuple[threading.Event, List[str]]] = {}
+_inflight_lock = threading.Lock()
+
+def _single_flight(key, fn):
+    with _inflight_lock:
+        entry = _INFLIGHT.get(key)
+        if entry is None:
+            entry = (threading.Event(), [])
+            _INFLIGHT[key] = entry
+            is_leader = True
+        else:
+            is_leader = False
+
+    event, result_box = entry
+    if not is_leader:
+        event.wait()
+        # Empty box means the leader's call raised; report no result
+        return result_box[0] if result_box else ""
+
     try:
-        response = supabase.table("chat_logs").insert(data).execute()
-        print(f"✅ Logged chat to Supabase: {user_input[:30]}...")
-        return response
-    except Exception as e:
-        print(f"Error logging chat: {e}")
-        return None
+        result = fn()
+        result_box.append(result)
+        return result
+    finally:
+        with _inflight_lock:
+            _INFLIGHT.pop(key, None)
+        event.set()
 
 # Generate health suggestion
 def generate_health_suggestion(pain: int, stress: int, fatigue: int) -> str:
+    cache_key = (pain, stress, fatigue)
+    cached = _SUGGESTION_CACHE.get(cache_key)
+    if cached and time.monotonic() - cached[0] < _SUGGESTION_TTL_SECONDS:
+        return cached[1]
+
+    # A burst of identical triples (same user double-submitting, or many
+    # users logging the same scores) collapses into one provider race
+    return _single_flight(cache_key, lambda: _generate_health_suggestion(pain, stress, fatigue))
+
+def _generate_health_suggestion(pain: int, stress: int, fatigue: int) -> str:
+    cache_key = (pain, stress, fatigue)
     prompt = f"""
     The user logged:
     - Pain level: {pain}/10
@@ -170,25 +547,34 @@ def generate_health_suggestion(pain: int, stress: int, fatigue: int) -> str:
 
     Write a short, supportive suggestion for managing these symptoms. Include self-care tips. Respond directly to the user in a kind, empathetic tone.
     """
-    
+
+    # Race the providers concurrently instead of waiting for OpenAI to fail
+    # before even starting Gemini. The work is pure network I/O, so the
+    # user-visible latency becomes max(provider latency) instead of the sum.
+    providers = [
+        ("openai", _health_suggestion_with_openai),
+        ("gemini", _health_suggestion_with_gemini),
+    ]
+    executor = ThreadPoolExecutor(max_workers=len(providers))
     try:
-        # Try OpenAI first
-        response = openai.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=150
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        print(f"OpenAI error for health suggestion, trying Gemini: {e}")
-        try:
-            # Fall back to Gemini
-            model = genai.GenerativeModel('gemini-1.5-pro')
-            response = model.generate_content(prompt)
-            return response.text.strip()
-        except Exception as e:
-            print(f"Gemini error for health suggestion: {e}")
-            return "I notice you're experiencing some symptoms. Remember to rest when needed and stay hydrated. Consider reaching out to your healthcare provider if symptoms persist or worsen."
+        futures = {executor.submit(fn, prompt): name for name, fn in providers}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                suggestion = future.result()
+                if suggestion:
+                    # First successful provider wins
+                    _SUGGESTION_CACHE[cache_key] = (time.monotonic(), suggestion)
+                    return suggestion
+            except Exception as e:
+                print(f"{name} error for health suggestion: {e}")
+    finally:
+        # Abandon the losing racer instead of blocking on it; a context
+        # manager here would wait for every racer and cap the happy path
+        # at the slowest provider's latency
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return "I notice you're experiencing some symptoms. Remember to rest when needed and stay hydrated. Consider reaching out to your healthcare provider if symptoms persist or worsen."
 
 # Log health scores
 def log_health_scores(user_id: str, pain: int, stress: int, fatigue: int, notes: str = ""):
@@ -198,25 +584,16 @@ def log_health_scores(user_id: str, pain: int, stress: int, fatigue: int, notes:
         
     suggestion = generate_health_suggestion(pain, stress, fatigue)
 
-    try:
-        response = supabase.table("health_logs").insert({
-            "user_id": user_id,
-            "pain_score": pain,
-            "stress_score": stress,
-            "fatigue_score": fatigue,
-            "notes": notes,
-            "suggestion": suggestion
-        }).execute()
-
-        if response.get("error"):
-            print("❌ Supabase insert error:", response["error"])
-            return None
-        else:
-            print("✅ Health scores + suggestion saved.")
-            return response
-    except Exception as e:
-        print(f"Error logging health scores: {e}")
-        return None
+    _enqueue_write("health_logs", {
+        "user_id": user_id,
+        "pain_score": pain,
+        "stress_score": stress,
+        "fatigue_score": fatigue,
+        "notes": notes,
+        "suggestion": suggestion
+    })
+    print("📨 Health scores + suggestion queued for Supabase.")
+    return suggestion
 
 # GFR calculator with enhanced error handling
 def calculate_egfr(age: Optional[int], gender: Optional[str], serum_creatinine: float) -> Optional[float]:
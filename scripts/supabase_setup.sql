@@ -59,7 +59,15 @@ CREATE TABLE IF NOT EXISTS public.education_articles (
 
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_chat_logs_user_id ON public.chat_logs(user_id);
-CREATE INDEX IF NOT EXISTS idx_journal_entries_user_id ON public.journal_entries(user_id);
+
+-- The "recent journal entries for a user" lookup filters on user_id and
+-- orders by created_at DESC with a small limit. The composite index serves
+-- that as a single index scan, and INCLUDE (content) makes it index-only
+-- for the columns the analysis path actually reads.
+DROP INDEX IF EXISTS idx_journal_entries_user_id;
+CREATE INDEX IF NOT EXISTS idx_journal_entries_user_recent
+  ON public.journal_entries(user_id, created_at DESC) INCLUDE (content);
+
 CREATE INDEX IF NOT EXISTS idx_health_logs_user_id ON public.health_logs(user_id);
 CREATE INDEX IF NOT EXISTS idx_education_articles_category ON public.education_articles(category);
 